@@ -0,0 +1,205 @@
+import base64
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from pathlib import Path
+
+ASSETS_DIR = Path.home() / "Documents" / "MacroFox" / "Cache" / "assets"
+PACK_PATH = Path(getattr(sys, "_MEIPASS", Path(__file__).parent)) / "assets.pack"
+
+# Pack layout: header, then one index entry per file (name length, blob
+# offset from the start of the file, blob length, utf-8 name), then the raw
+# blobs. See pack_assets.py for the writer.
+PACK_MAGIC = b"MFXPACK1"
+PACK_HEADER = struct.Struct("<8sI")
+PACK_ENTRY = struct.Struct("<HII")
+
+# Material thumbnail sizes built by pack_assets.py, in logical pixels:
+# hotbar slots and the settings grid. The palette shows the 70 px source
+# images as they are.
+THUMB_SIZES = (46, 28)
+# Highest display scaling thumbnails stay sharp at (150%); each one is
+# rendered at its logical size times this
+THUMB_SCALE = 1.5
+
+
+class AssetPack:
+    """Read-only, memory-mapped view of an asset pack.
+
+    Only the index is parsed when the pack is opened; blobs are copied out of
+    the mapping the first time they are asked for.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count = PACK_HEADER.unpack_from(self._mm, 0)
+        if magic != PACK_MAGIC:
+            raise ValueError(f"{path} is not a MacroFox asset pack")
+        self.index = {}
+        pos = PACK_HEADER.size
+        for _ in range(count):
+            name_len, offset, length = PACK_ENTRY.unpack_from(self._mm, pos)
+            pos += PACK_ENTRY.size
+            name = self._mm[pos:pos + name_len].decode("utf-8")
+            pos += name_len
+            self.index[name] = (offset, length)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def size(self, name):
+        return self.index[name][1]
+
+    def read(self, name):
+        offset, length = self.index[name]
+        return self._mm[offset:offset + length]
+
+    def digest(self):
+        return hashlib.sha1(self._mm).hexdigest()
+
+
+class _EmbeddedModule:
+    """Fallback for trees without assets.pack: the old base64 module."""
+
+    def __init__(self):
+        from assets_b64 import MATERIAL_IMAGES, APP_ICON_B64
+        self._b64 = {f"materials/{mat}.webp": b64 for mat, b64 in MATERIAL_IMAGES.items()}
+        if APP_ICON_B64:
+            self._b64["materials/icon.png"] = APP_ICON_B64
+        self.index = self._b64
+
+    def __contains__(self, name):
+        return name in self._b64
+
+    def size(self, name):
+        return len(self.read(name))
+
+    def read(self, name):
+        return base64.b64decode(self._b64[name])
+
+    def digest(self):
+        h = hashlib.sha1()
+        for name in sorted(self._b64):
+            h.update(name.encode("utf-8"))
+            h.update(self._b64[name].encode("ascii"))
+        return h.hexdigest()
+
+
+_pack = None
+
+
+def get_pack():
+    global _pack
+    if _pack is None:
+        try:
+            _pack = AssetPack(PACK_PATH)
+        except (OSError, ValueError, struct.error):
+            _pack = _EmbeddedModule()
+    return _pack
+
+
+# "asset": controls point at /materials/<name>.webp and the client fetches
+# each file once. "inline": every control carries the whole image as a data
+# URI, which is what happens if the assets folder can't be written.
+_mode = "inline"
+_inline_src = {}
+
+
+def prepare_assets_dir():
+    """Write the packed images out so Flet can serve them by URL.
+
+    Returns the folder to pass to ``ft.run(assets_dir=...)``, or None to keep
+    images inline. Set MACROFOX_ASSETS=inline to force the old behaviour.
+    The folder is stamped with the pack's hash; a different pack rewrites
+    every file, otherwise only missing ones are written.
+    """
+    global _mode
+    if os.environ.get("MACROFOX_ASSETS") == "inline":
+        return None
+    pack = get_pack()
+    stamp = ASSETS_DIR / ".pack"
+    digest = pack.digest()
+    try:
+        current = stamp.exists() and stamp.read_text() == digest
+        for name in pack.index:
+            path = ASSETS_DIR / name
+            if not current or not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_bytes(pack.read(name))
+        if not current:
+            stamp.write_text(digest)
+    except OSError:
+        return None
+    _mode = "asset"
+    return str(ASSETS_DIR)
+
+
+def _inline(name, mime):
+    src = _inline_src.get(name)
+    if src is None:
+        data = base64.b64encode(get_pack().read(name)).decode("ascii")
+        src = _inline_src[name] = f"data:{mime};base64,{data}"
+    return src
+
+
+def get_image_src(mat, size=None):
+    """Return the image src for Flet, a short asset URL when possible.
+
+    With ``size`` the matching thumbnail is used if the pack has one.
+    """
+    pack = get_pack()
+    name = f"materials/{size}/{mat}.webp"
+    if size is None or name not in pack:
+        name = f"materials/{mat}.webp"
+    if name not in pack:
+        return None
+    if _mode == "asset":
+        return f"/{name}"
+    return _inline(name, "image/webp")
+
+
+# Flet loads one file per font family, so each Roboto weight the UI uses is
+# registered as a family of its own
+BUNDLED_FONTS = {
+    "Roboto": "fonts/Roboto-Regular.ttf",
+    "Roboto Medium": "fonts/Roboto-Medium.ttf",
+    "Roboto Bold": "fonts/Roboto-Bold.ttf",
+}
+
+
+def bundled_fonts():
+    """{family: URL} of the packed Roboto faces, or None if they can't be served locally."""
+    pack = get_pack()
+    if _mode != "asset" or BUNDLED_FONTS["Roboto"] not in pack:
+        return None
+    return {family: f"/{name}" for family, name in BUNDLED_FONTS.items() if name in pack}
+
+
+def app_icon_src():
+    if "materials/icon.png" not in get_pack():
+        return None
+    return _inline("materials/icon.png", "image/png")
+
+
+def payload_report():
+    """Bytes of image src sent per control in each mode.
+
+    A slot redraw sends one src, a theme switch re-sends one per material.
+    """
+    pack = get_pack()
+    names = [name for name in pack.index if name.endswith(".webp")]
+    inline = {name: len("data:image/webp;base64,") + (pack.size(name) + 2) // 3 * 4 for name in names}
+    asset = {name: len(f"/{name}") for name in names}
+    print(f"{'image':<36}{'inline':>10}{'asset':>8}")
+    for name in names:
+        print(f"{name:<36}{inline[name]:>10}{asset[name]:>8}")
+    total_inline, total_asset = sum(inline.values()), sum(asset.values())
+    print(f"{'theme switch':<36}{total_inline:>10}{total_asset:>8}")
+    print(f"{'slot redraw (avg)':<36}{total_inline // len(inline):>10}{total_asset // len(asset):>8}")
+
+
+if __name__ == "__main__":
+    payload_report()
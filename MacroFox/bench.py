@@ -0,0 +1,178 @@
+"""Headless scheduling benchmarks for the macro engine.
+
+    python bench.py [--hours 8] [--gate] [--record]
+
+Each scenario runs MacroEngine on a SimClock with a fake keyboard that takes a
+random few milliseconds per press, so hours of play take a fraction of a
+second. For every press we know the deadline it was due at, which gives:
+
+    late     how long after its due time a press started
+    missed   whole cooldown windows lost because a press was that late
+    doubled  presses sent while the slot was still on cooldown
+    wakeups  scheduler loop iterations
+
+It also times real stop+start cycles of the engine worker (restart).
+--record runs every scenario with session recording on, to check that it
+costs nothing measurable; the logs go to a temporary folder.
+With --gate the run exits non-zero if any scenario breaks GATE.
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from catalog import MATERIAL_TIMER, PRESETS
+from engine import SLOT_COUNT, MacroEngine, SimClock, SlotTable
+
+GATE = {
+    "p99_late_ms": 150,
+    "max_late_ms": 400,
+    "missed": 0,
+    "doubled": 0,
+    "wakeups_per_press": 2.5,
+    "max_restart_ms": 50,
+}
+
+
+class Session:
+    """One simulated run: engine, clock, fake keyboard and the press log."""
+
+    record_dir = None
+
+    def __init__(self, preset, key_gap=0.03, latency=(0.002, 0.015), seed=1):
+        self.clock = SimClock()
+        self.rng = random.Random(seed)
+        self.latency = latency
+        slots = list(preset[:SLOT_COUNT]) + [None] * (SLOT_COUNT - len(preset))
+        table = SlotTable(slots, [False] * SLOT_COUNT, dict(MATERIAL_TIMER))
+        self.engine = MacroEngine(table, key_gap, clock=self.clock, key_sink=self.press)
+        if self.record_dir is not None:
+            self.engine.start_recording(Path(self.record_dir) / f"session{id(self)}.mfxrec")
+        self.active_since = 0.0
+        self.late = []
+        self.missed = 0
+        self.doubled = 0
+
+    def press(self, key):
+        idx = int(key) - 1
+        now = self.clock.now()
+        due = max(self.engine.cooldown_end[idx], self.active_since)
+        if now < self.engine.cooldown_end[idx]:
+            self.doubled += 1
+        late = now - due
+        self.late.append(late)
+        self.missed += int(late // self.engine.table.durations[idx])
+        self.clock.sleep(self.rng.uniform(*self.latency))
+
+    def run(self, seconds):
+        self.engine.run_simulated(self.clock.now() + seconds)
+
+    def pause(self, seconds):
+        self.engine.pause()
+        self.clock.sleep(seconds)
+        self.engine.resume()
+        self.active_since = self.clock.now()
+
+    def report(self):
+        self.engine.stop_recording()
+        late = sorted(self.late)
+        presses = len(late)
+        return {
+            "presses": presses,
+            "p50_late_ms": late[presses // 2] * 1000 if late else 0.0,
+            "p99_late_ms": late[min(presses - 1, presses * 99 // 100)] * 1000 if late else 0.0,
+            "max_late_ms": late[-1] * 1000 if late else 0.0,
+            "missed": self.missed,
+            "doubled": self.doubled,
+            "wakeups": self.engine.wakeups,
+            "wakeups_per_press": self.engine.wakeups / max(presses, 1),
+        }
+
+
+def boost(hours):
+    session = Session(PRESETS["Boost"])
+    session.run(hours * 3600)
+    return session
+
+
+def boost_with_pauses(hours):
+    session = Session(PRESETS["Boost"])
+    for _ in range(int(hours * 6)):
+        session.run(570)
+        session.pause(30)
+    return session
+
+
+def boost_with_edits(hours):
+    session = Session(PRESETS["Boost"])
+    for n in range(int(hours * 4)):
+        session.run(450)
+        a, b = n % SLOT_COUNT, (n + 3) % SLOT_COUNT
+        engine = session.engine
+        engine.set_table(engine.table.with_swapped(a, b), {a: engine.cooldown_end[b], b: engine.cooldown_end[a]})
+        session.run(450)
+        engine.set_timers(dict(engine.table.timers, Jelly_Beans=45 + n % 5))
+    return session
+
+
+def long_buffs(hours):
+    session = Session(["Super_Smoothie", "Marshmallow_Bee", "Glitter", "Purple_Potion"])
+    session.run(hours * 3600)
+    return session
+
+
+def restart_latency(cycles=200):
+    """Milliseconds for stop() + start() on a real, idle-but-armed engine."""
+    table = SlotTable(list(PRESETS["Boost"]), [False] * SLOT_COUNT, dict(MATERIAL_TIMER))
+    engine = MacroEngine(table, key_sink=lambda key: None)
+    engine.start()
+    took = []
+    for _ in range(cycles):
+        start = time.perf_counter()
+        engine.stop()
+        engine.start()
+        took.append((time.perf_counter() - start) * 1000)
+    engine.stop()
+    took.sort()
+    return {"p50_restart_ms": took[len(took) // 2], "max_restart_ms": took[-1]}
+
+
+SCENARIOS = {
+    "boost": boost,
+    "boost+pauses": boost_with_pauses,
+    "boost+edits": boost_with_edits,
+    "long-buffs": long_buffs,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate long MacroFox sessions and report press timing")
+    parser.add_argument("--hours", type=float, default=8)
+    parser.add_argument("--gate", action="store_true", help="exit 1 if a scenario breaks GATE")
+    parser.add_argument("--record", action="store_true", help="record every session while benchmarking")
+    args = parser.parse_args()
+    if args.record:
+        Session.record_dir = tempfile.mkdtemp(prefix="macrofox-bench-")
+
+    failed = []
+    print(f"{'scenario':<14}{'presses':>9}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+          f"{'missed':>8}{'doubled':>9}{'wakeups':>9}{'wk/press':>10}")
+    for name, scenario in SCENARIOS.items():
+        r = scenario(args.hours).report()
+        print(f"{name:<14}{r['presses']:>9}{r['p50_late_ms']:>9.1f}{r['p99_late_ms']:>9.1f}{r['max_late_ms']:>9.1f}"
+              f"{r['missed']:>8}{r['doubled']:>9}{r['wakeups']:>9}{r['wakeups_per_press']:>10.2f}")
+        failed += [f"{name}: {key} {r[key]:.1f} > {limit}" for key, limit in GATE.items() if r.get(key, 0) > limit]
+    r = restart_latency()
+    print(f"\nrestart: p50 {r['p50_restart_ms']:.2f} ms, max {r['max_restart_ms']:.2f} ms")
+    if r["max_restart_ms"] > GATE["max_restart_ms"]:
+        failed.append(f"restart: max_restart_ms {r['max_restart_ms']:.1f} > {GATE['max_restart_ms']}")
+    if failed:
+        print("\n".join(["", "Gate failures:"] + failed))
+    if args.gate and failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+MATERIALS = ["Sprinkler_Builder", "Gumdrops", "Coconut", "Stinger", "Snowflake", "Jelly_Beans", "Red_Extract", "Blue_Extract", "Glitter", "Glue", "Oil", "Enzymes", "Tropical_Drink", "Purple_Potion", "Super_Smoothie", "Marshmallow_Bee", "Magic_Bean"]
+
+MATERIAL_INFO = {
+    "Blue_Extract": "Grants x1.25 Blue Pollen for 10 minutes.",
+    "Cloud_Vial": "Summons a Cloud in the field you're standing in. Lasts for 3 minutes.",
+    "Coconut": "Drops a huge Coconut into the field. Catch it to convert pollen to Honey Tokens.",
+    "Enzymes": "Grants +10% Instant Conversion and x1.25 Conversion Rate for 10 minutes.",
+    "Glitter": "Boosts the field you're standing in, granting +100% pollen for 15 minutes.",
+    "Glue": "Grants x1.25 Bee Gather Pollen and Tools for 10 minutes.",
+    "Gumdrops": "Use while standing in a field to cover flowers in goo. Goo grants bonus honey.",
+    "Jelly_Beans": "Scatters various buff-granting beans on nearby flowers. Works best when shared.",
+    "Magic_Bean": "Plants a random Sprout in the field you're standing in.",
+    "Marshmallow_Bee": "50% White Pollen, +50% Capacity, and +250% Conversion Rate for 30 minutes.",
+    "Micro-Converter": "Instantly converts all Pollen in your bag to Honey.",
+    "Oil": "Grants x1.2 Bee and Player Movespeed for 10 minutes.",
+    "Purple_Potion": "Grants x1.25 Capacity, x1.25 Convert Rate At Hive, x1.5 Red Pollen, x1.5 Blue Pollen, x1.3 Bee Gather Pollen, and x1.3 Pollen From Tools for 15 minutes.",
+    "Red_Extract": "Grants x1.25 Red Pollen for 10 minutes.",
+    "Snowflake": "Sends a cool, soothing breeze to all the players on the server (Melts after Beesmas!)",
+    "Sprinkler_Builder": "Use while standing in flowers to place a Sprinkler.",
+    "Stinger": "Grants your bees x1.5 attack for 30 seconds.",
+    "Super_Smoothie": "Grants x1.5 Capacity, x1.6 Red Pollen, x1.6 Blue Pollen, x1.6 White Pollen, x1.4 Bee Gather Pollen, x1.4 Pollen From Tools, x2 Convert Rate, x1.5 Convert Rate At Hive, +12% Instant Conversion, +7% Critical Chance, x1.25 Bee Movespeed, and x1.25 Player Movespeed for 20 minutes.",
+    "Tropical_Drink": "Grants x1.25 White Pollen and +5% Critical Chance for 10 minutes.",
+}
+
+MATERIAL_TIMER = {
+    "Blue_Extract": 600,
+    "Cloud_Vial": 180,
+    "Coconut": 1,
+    "Enzymes": 600,
+    "Glitter": 910,
+    "Glue": 600,
+    "Gumdrops": 1,
+    "Jelly_Beans": 45,
+    "Magic_Bean": 1,
+    "Marshmallow_Bee": 1800,
+    "Micro-Converter": 15,
+    "Oil": 600,
+    "Purple_Potion": 900,
+    "Red_Extract": 600,
+    "Snowflake": 1,
+    "Sprinkler_Builder": 5,
+    "Stinger": 10,
+    "Super_Smoothie": 1200,
+    "Tropical_Drink": 600,
+}
+
+PRESETS = {
+    "Boost": ["Sprinkler_Builder", "Stinger", "Coconut", "Jelly_Beans", "Gumdrops", "Super_Smoothie", "Glitter"],
+}
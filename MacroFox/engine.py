@@ -0,0 +1,491 @@
+import heapq
+from array import array
+import queue
+import threading
+import time
+
+from metrics import EngineMetrics
+import recorder as rec
+
+SLOT_COUNT = 7
+DEFAULT_KEY_GAP = 0.03
+# Seconds before a slot whose key press failed is tried again
+KEY_RETRY_DELAY = 1.0
+# Most recent key press failures kept in KeyDispatcher.errors
+MAX_KEY_ERRORS = 20
+
+
+class MonotonicClock:
+    """The real clock; all engine deadlines are on time.monotonic()."""
+
+    now = staticmethod(time.monotonic)
+    sleep = staticmethod(time.sleep)
+
+
+class SimClock:
+    """Virtual clock for headless runs: sleeping just moves time forward."""
+
+    def __init__(self, start=0.0):
+        self.t = start
+
+    def now(self):
+        return self.t
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            self.t += seconds
+
+    def advance_to(self, t):
+        self.t = max(self.t, t)
+
+
+def keyboard_sink(key):
+    # Imported on first use so the engine can run headless without keyboard
+    import keyboard
+    keyboard.press_and_release(key)
+
+
+class KeyDispatcher:
+    """Single worker that injects key presses for the engine.
+
+    The scheduler hands over batches of ``(slot, material)`` that came due
+    together; they are sent in order with at least ``gap`` seconds between two
+    presses, and ``on_sent(slot, material, sent_at)`` reports the real send
+    time so cooldowns are counted from the press itself rather than from when
+    the scheduler woke up. A ``synchronous`` dispatcher sends inside
+    ``submit`` instead, which is what simulated runs use. Time spent in
+    ``key_sink`` goes to ``key_send_ms`` when a histogram is given.
+
+    A ``key_sink`` that raises doesn't take the worker down: the error goes
+    to ``errors`` (the last MAX_KEY_ERRORS of them, as (slot, exception))
+    and ``on_failed(slot, material, at)`` is called instead of ``on_sent``.
+    """
+
+    def __init__(self, on_sent, gap=DEFAULT_KEY_GAP, clock=None, key_sink=None, synchronous=False,
+                 key_send_ms=None, on_failed=None):
+        self.on_sent = on_sent
+        self.on_failed = on_failed
+        self.errors = []
+        self.gap = gap
+        self.clock = clock or MonotonicClock()
+        self.key_sink = key_sink or keyboard_sink
+        self.synchronous = synchronous
+        self.key_send_ms = key_send_ms
+        self._queue = queue.Queue(maxsize=SLOT_COUNT)
+        self._thread = None
+        self._last_sent = float("-inf")
+        self._generation = 0
+
+    def start(self):
+        if self.synchronous:
+            return
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="MacroFox-keys", daemon=True)
+            self._thread.start()
+
+    @property
+    def generation(self):
+        """Bumped by ``clear``; batches submitted under an older one are dropped."""
+        return self._generation
+
+    def submit(self, batch, generation=None):
+        """Queue a batch without blocking; returns False when the queue is full.
+
+        ``generation`` is the one the batch was built under, read while the
+        caller still held the lock ``clear`` is called with, so a clear that
+        lands before the batch is queued still drops it.
+        """
+        if generation is None:
+            generation = self._generation
+        if self.synchronous:
+            self._send(generation, batch)
+            return True
+        try:
+            self._queue.put_nowait((generation, batch))
+            return True
+        except queue.Full:
+            return False
+
+    def clear(self):
+        """Drop queued batches and abandon the rest of the one being sent."""
+        self._generation += 1
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                return
+
+    def _send(self, generation, batch):
+        for idx, mat in batch:
+            if generation != self._generation:
+                break
+            wait = self._last_sent + self.gap - self.clock.now()
+            if wait > 0:
+                self.clock.sleep(wait)
+            started = time.perf_counter()
+            try:
+                self.key_sink(str(idx + 1))
+            except Exception as e:
+                self.errors.append((idx, e))
+                del self.errors[:-MAX_KEY_ERRORS]
+                if self.on_failed is not None:
+                    self.on_failed(idx, mat, self.clock.now())
+                continue
+            if self.key_send_ms is not None:
+                self.key_send_ms.observe((time.perf_counter() - started) * 1000)
+            self._last_sent = self.clock.now()
+            self.on_sent(idx, mat, self._last_sent)
+
+    def _run(self):
+        while True:
+            generation, batch = self._queue.get()
+            self._send(generation, batch)
+
+
+class SlotTable:
+    """Immutable snapshot of the hotbar.
+
+    Holds the material and disabled flag of every slot, each slot's cooldown
+    duration (resolved from ``timers`` when the table is built) and the
+    reverse ``material_to_slot`` map. Changes never mutate a table: the
+    ``with_*`` methods return a new one, copying only what differs, and the
+    owner publishes it with MacroEngine.set_table. Readers take
+    ``engine.table`` once and get a consistent view without locking.
+    """
+
+    __slots__ = ("materials", "disabled", "durations", "material_to_slot", "timers")
+
+    def __init__(self, materials, disabled, timers, material_to_slot=None):
+        self.materials = tuple(materials)
+        self.disabled = tuple(disabled)
+        self.timers = timers
+        self.durations = tuple(timers.get(mat, 1) if mat is not None else 0 for mat in self.materials)
+        if material_to_slot is None:
+            material_to_slot = {mat: i for i, mat in enumerate(self.materials) if mat is not None}
+        self.material_to_slot = material_to_slot
+
+    @classmethod
+    def empty(cls, timers):
+        return cls([None] * SLOT_COUNT, [False] * SLOT_COUNT, timers, {})
+
+    def _replace(self, changes, material_to_slot=None):
+        """New table with ``changes`` = {slot: (material, disabled)} applied."""
+        materials, disabled = list(self.materials), list(self.disabled)
+        for idx, (mat, off) in changes.items():
+            materials[idx], disabled[idx] = mat, off
+        return SlotTable(materials, disabled, self.timers,
+                         self.material_to_slot if material_to_slot is None else material_to_slot)
+
+    def with_material(self, idx, mat):
+        """Put ``mat`` in slot ``idx``, moving it out of its old slot if it had one."""
+        changes = {idx: (mat, False)}
+        index = dict(self.material_to_slot)
+        old_idx = index.pop(mat, None)
+        if old_idx is not None and old_idx != idx:
+            changes[old_idx] = (None, False)
+        index.pop(self.materials[idx], None)
+        index[mat] = idx
+        return self._replace(changes, index)
+
+    def with_cleared(self, idx):
+        index = dict(self.material_to_slot)
+        index.pop(self.materials[idx], None)
+        return self._replace({idx: (None, False)}, index)
+
+    def with_disabled(self, idx, disabled):
+        return self._replace({idx: (self.materials[idx], disabled)})
+
+    def with_swapped(self, a, b):
+        index = dict(self.material_to_slot)
+        if self.materials[a] is not None:
+            index[self.materials[a]] = b
+        if self.materials[b] is not None:
+            index[self.materials[b]] = a
+        return self._replace({a: (self.materials[b], self.disabled[b]),
+                              b: (self.materials[a], self.disabled[a])}, index)
+
+    def with_timers(self, timers):
+        return SlotTable(self.materials, self.disabled, timers, self.material_to_slot)
+
+
+class MacroEngine:
+    """Presses hotbar slots as soon as their cooldowns end.
+
+    Next-due deadlines are kept in a heap on the engine clock and the worker
+    sleeps on an Event until the earliest one, so presses are not rounded up
+    to a polling interval and an idle engine does not wake at all. Changing
+    slots, timers or the pause state goes through ``set_table`` and the other
+    setters, which rebuild the heap and wake the worker immediately.
+
+    The engine owns at most one worker thread. ``start`` (after an optional,
+    cancellable delay) and ``stop`` (which joins the worker, bounded by a
+    timeout) can be called back to back without ever leaving two loops
+    pressing keys; pause, resume and stop are Events, so nothing polls.
+    ``last_start_latency`` and ``last_stop_latency`` record how long the
+    last start (excluding the delay) and stop took, in seconds, and
+    ``metrics`` (an EngineMetrics) counts presses and times every press and
+    scheduler pass. ``start_recording`` logs every press, pause, resume,
+    slot and timer change to a SessionRecorder on the engine clock.
+
+    ``clock`` and ``key_sink`` can be swapped out to run without a keyboard:
+    with a SimClock, ``run_simulated`` replaces ``start`` and drives the same
+    scheduling step without threads or real sleeps.
+    """
+
+    def __init__(self, table, key_gap=DEFAULT_KEY_GAP, clock=None, key_sink=None):
+        self.table = table
+        self.cooldown_end = array("d", [0.0] * SLOT_COUNT)
+        self.clock = clock or MonotonicClock()
+        self.wakeups = 0
+        self.last_start_latency = None
+        self.last_stop_latency = None
+        self.metrics = EngineMetrics(SLOT_COUNT)
+        # Lateness is measured from here when a deadline passed while stopped
+        # or paused
+        self._active_since = self.clock.now()
+        self.recorder = None
+        # Called as on_press(slot) from the dispatcher thread after a press
+        self.on_press = None
+        # Guards the heap and pending set, shared with the dispatcher thread
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._resumed = threading.Event()
+        self._resumed.set()
+        self._stopping = threading.Event()
+        self._worker = None
+        self._started_at = None
+        self._heap = []
+        self._dirty = True
+        # Slots handed to the dispatcher and not sent yet; they get a new
+        # deadline only once the real send time is known.
+        self._pending = set()
+        self.dispatcher = KeyDispatcher(self._on_sent, key_gap, self.clock, key_sink,
+                                        synchronous=isinstance(self.clock, SimClock),
+                                        key_send_ms=self.metrics.key_send_ms, on_failed=self._on_failed)
+
+    @property
+    def running(self):
+        return self._worker is not None and self._worker.is_alive() and not self._stopping.is_set()
+
+    @property
+    def paused(self):
+        return not self._resumed.is_set()
+
+    def set_table(self, table, cooldowns=None):
+        """Publish a new SlotTable.
+
+        ``cooldowns`` maps slot -> deadline for slots whose cooldown changes
+        together with the table (cleared, moved or swapped slots).
+        """
+        with self._lock:
+            if cooldowns:
+                for idx, deadline in cooldowns.items():
+                    self.cooldown_end[idx] = deadline
+            old, self.table = self.table, table
+            self._dirty = True
+        self._wake.set()
+        if self.recorder is not None:
+            self._record_table(old, table)
+
+    def set_timers(self, timers):
+        self.set_table(self.table.with_timers(timers))
+
+    def set_key_gap(self, gap):
+        self.dispatcher.gap = gap
+
+    def _drop_pending(self):
+        with self._lock:
+            self.dispatcher.clear()
+            self._pending.clear()
+            self._dirty = True
+
+    def pause(self):
+        self._resumed.clear()
+        self._drop_pending()
+        self._wake.set()
+        self._record(rec.PAUSE)
+
+    def resume(self):
+        with self._lock:
+            self._dirty = True
+            self._active_since = self.clock.now()
+        self._resumed.set()
+        self._wake.set()
+        self._record(rec.RESUME)
+
+    def start(self, delay=0.0):
+        """Start the worker, first stopping the old one if there is one.
+
+        The worker waits ``delay`` seconds before its first press; a ``stop``
+        during that wait cancels the start.
+        """
+        if self._worker is not None:
+            self.stop()
+        # A fresh Event per worker: one that outlived stop()'s timeout still
+        # sees its own stop request and can never run alongside the new one.
+        self._stopping = threading.Event()
+        self._resumed.set()
+        self._drop_pending()
+        self._started_at = self.clock.now()
+        self.dispatcher.start()
+        self._worker = threading.Thread(target=self._run, args=(delay, self._stopping),
+                                        name="MacroFox-engine", daemon=True)
+        self._worker.start()
+
+    def stop(self, timeout=1.0):
+        """Stop the worker and wait up to ``timeout`` for it; True if it exited."""
+        started = self.clock.now()
+        self._stopping.set()
+        self._resumed.set()
+        self._wake.set()
+        self._drop_pending()
+        worker, self._worker = self._worker, None
+        if worker is not None and worker is not threading.current_thread():
+            worker.join(timeout)
+        self.last_stop_latency = self.clock.now() - started
+        if worker is not None:
+            self._record(rec.STOP)
+        return worker is None or not worker.is_alive()
+
+    def _on_sent(self, idx, mat, sent_at):
+        table = self.table
+        with self._lock:
+            self._pending.discard(idx)
+            if table.materials[idx] != mat:
+                return
+            self.metrics.presses_total[idx] += 1
+            if self.recorder is not None:
+                self.recorder.record(sent_at, rec.PRESS, idx, self.recorder.codes.get(mat, -1))
+            due = max(self.cooldown_end[idx], self._active_since)
+            self.metrics.press_late_ms[idx].observe(max(sent_at - due, 0.0) * 1000)
+            self.cooldown_end[idx] = sent_at + table.durations[idx]
+            if not self._dirty:
+                heapq.heappush(self._heap, (self.cooldown_end[idx], idx))
+        self._wake.set()
+        if self.on_press is not None:
+            self.on_press(idx)
+
+    def _on_failed(self, idx, mat, at):
+        # The press never happened: put the slot back on the schedule, a
+        # little later so a sink that keeps failing doesn't spin the worker
+        with self._lock:
+            self._pending.discard(idx)
+            if self.table.materials[idx] != mat:
+                return
+            self.cooldown_end[idx] = max(self.cooldown_end[idx], at + KEY_RETRY_DELAY)
+            self._dirty = True
+        self._wake.set()
+
+    def _rebuild(self):
+        table = self.table
+        self._heap = [
+            (self.cooldown_end[i], i)
+            for i in range(SLOT_COUNT)
+            if table.materials[i] is not None and not table.disabled[i] and i not in self._pending
+        ]
+        heapq.heapify(self._heap)
+        self._dirty = False
+
+    def _step(self, now):
+        """Hand every due slot to the dispatcher; returns the next deadline.
+
+        Returns ``now`` when it dispatched something (the heap must be looked
+        at again) and None when there is nothing to wait for.
+        """
+        with self._lock:
+            if self._dirty:
+                self._rebuild()
+            due = []
+            while self._heap and self._heap[0][0] <= now:
+                due.append(heapq.heappop(self._heap)[1])
+            if not due:
+                return self._heap[0][0] if self._heap else None
+            materials = self.table.materials
+            batch = [(i, materials[i]) for i in due]
+            self._pending.update(due)
+            # _drop_pending bumps the generation under this lock, so a pause
+            # or stop from here on drops the batch even before it is queued
+            generation = self.dispatcher.generation
+        # Outside the lock: a synchronous dispatcher reports back through
+        # _on_sent right away
+        if not self.dispatcher.submit(batch, generation):
+            with self._lock:
+                self._pending.difference_update(due)
+                for i in due:
+                    heapq.heappush(self._heap, (now + self.dispatcher.gap, i))
+        return now
+
+    def _run(self, delay, stopping):
+        if delay > 0 and stopping.wait(delay):
+            return
+        self.last_start_latency = self.clock.now() - self._started_at - max(delay, 0)
+        self._active_since = self.clock.now()
+        self._record(rec.START)
+        loop_pass_ms = self.metrics.loop_pass_ms
+        while not stopping.is_set():
+            if not self._resumed.is_set():
+                self._resumed.wait()
+                continue
+            self.wakeups += 1
+            self._wake.clear()
+            started = time.perf_counter()
+            now = self.clock.now()
+            next_at = self._step(now)
+            loop_pass_ms.observe((time.perf_counter() - started) * 1000)
+            if next_at == now:
+                continue
+            self._wake.wait(None if next_at is None else next_at - now)
+
+    def start_recording(self, path):
+        """Log this session to ``path``, starting with the current slots and timers."""
+        self.stop_recording()
+        table = self.table
+        recorder = rec.SessionRecorder(path, list(table.timers), self.clock.now(), time.time())
+        self.recorder = recorder
+        self._record_table(SlotTable.empty({}), table)
+        return recorder
+
+    def stop_recording(self):
+        recorder, self.recorder = self.recorder, None
+        if recorder is not None:
+            recorder.close()
+
+    def _record(self, kind):
+        if self.recorder is not None:
+            self.recorder.record(self.clock.now(), kind)
+
+    def _record_table(self, old, new):
+        recorder, now = self.recorder, self.clock.now()
+        if recorder is None:
+            return
+        codes = recorder.codes
+        for i in range(SLOT_COUNT):
+            if new.materials[i] != old.materials[i]:
+                recorder.record(now, rec.SLOT, i, codes.get(new.materials[i], -1))
+            if new.disabled[i] != old.disabled[i]:
+                recorder.record(now, rec.DISABLE, i, value=int(new.disabled[i]))
+        if new.timers is not old.timers:
+            for mat, seconds in new.timers.items():
+                if old.timers.get(mat) != seconds and mat in codes:
+                    recorder.record(now, rec.TIMER, code=codes[mat], value=int(seconds))
+
+    def metrics_snapshot(self):
+        return self.metrics.snapshot()
+
+    def run_simulated(self, until):
+        """Run on a SimClock up to time ``until``.
+
+        Each loop is one wakeup of the real worker: jump to the next deadline,
+        dispatch what is due, repeat. Slots, timers and pause can be changed
+        between calls to script a session.
+        """
+        while self._resumed.is_set():
+            now = self.clock.now()
+            self.wakeups += 1
+            next_at = self._step(now)
+            if next_at == now:
+                continue
+            if next_at is None or next_at > until:
+                break
+            self.clock.advance_to(next_at)
+        self.clock.advance_to(until)
@@ -0,0 +1,209 @@
+import atexit
+import multiprocessing
+import threading
+from multiprocessing import shared_memory
+
+from catalog import MATERIAL_TIMER
+from engine import DEFAULT_KEY_GAP, SLOT_COUNT, MacroEngine, SlotTable
+
+MATERIAL_CODES = list(MATERIAL_TIMER)
+_CODE_OF = {mat: code for code, mat in enumerate(MATERIAL_CODES)}
+
+# Shared block layout: config sequence number (odd while the UI is writing),
+# material code per slot (-1 = empty), disabled flag per slot, then the
+# cooldown deadline of each slot on time.monotonic(), which is system wide.
+_SEQ = 0
+_CODES = 8
+_DISABLED = _CODES + 4 * SLOT_COUNT
+_COOLDOWNS = (_DISABLED + SLOT_COUNT + 7) // 8 * 8
+BLOCK_SIZE = _COOLDOWNS + 8 * SLOT_COUNT
+
+
+class _SlotBlock:
+    def __init__(self, shm):
+        self.shm = shm
+        buf = shm.buf
+        self.seq = buf[_SEQ:_SEQ + 4].cast("I")
+        self.codes = buf[_CODES:_DISABLED].cast("i")
+        self.disabled = buf[_DISABLED:_DISABLED + SLOT_COUNT]
+        self.cooldown_end = buf[_COOLDOWNS:BLOCK_SIZE].cast("d")
+
+    def write_config(self, table):
+        self.seq[0] += 1
+        for i in range(SLOT_COUNT):
+            self.codes[i] = _CODE_OF.get(table.materials[i], -1)
+            self.disabled[i] = 1 if table.disabled[i] else 0
+        self.seq[0] += 1
+
+    def read_config(self, timers):
+        while True:
+            seq = self.seq[0]
+            if seq % 2:
+                continue
+            materials = [MATERIAL_CODES[code] if code >= 0 else None for code in self.codes]
+            disabled = [bool(flag) for flag in self.disabled]
+            if self.seq[0] == seq:
+                return SlotTable(materials, disabled, timers)
+
+    def release(self):
+        for view in (self.seq, self.codes, self.disabled, self.cooldown_end):
+            view.release()
+
+
+def _child_main(shm_name, commands, events, timers, key_gap):
+    block = _SlotBlock(shared_memory.SharedMemory(name=shm_name))
+    engine = MacroEngine(block.read_config(timers), key_gap)
+    engine.cooldown_end = block.cooldown_end
+    # Presses come from the dispatcher thread, metrics replies from here
+    send_lock = threading.Lock()
+
+    def send(msg):
+        with send_lock:
+            events.send(msg)
+
+    engine.on_press = send
+    while True:
+        try:
+            cmd, arg = commands.recv()
+        except EOFError:
+            cmd, arg = "exit", None
+        if cmd == "sync":
+            table = block.read_config(engine.table.timers)
+            # A press of a slot's old material that raced the UI change may
+            # have overwritten the deadline the UI wrote for it, so the UI
+            # sends its deadlines along and they are applied again together
+            # with the new table; emptied slots are always ready
+            cooldowns = {i: 0.0 for i in range(SLOT_COUNT) if table.materials[i] is None}
+            cooldowns.update(arg or {})
+            engine.set_table(table, cooldowns)
+        elif cmd == "timers":
+            engine.set_timers(arg)
+        elif cmd == "gap":
+            engine.set_key_gap(arg)
+        elif cmd == "pause":
+            engine.pause()
+        elif cmd == "resume":
+            engine.resume()
+        elif cmd == "start":
+            engine.start(arg)
+        elif cmd == "stop":
+            engine.stop()
+        elif cmd == "record":
+            engine.start_recording(arg)
+        elif cmd == "metrics":
+            send(("metrics", engine.metrics_snapshot()))
+        elif cmd == "exit":
+            engine.stop()
+            engine.stop_recording()
+            block.release()
+            block.shm.close()
+            return
+
+
+class EngineProcess:
+    """MacroEngine running in a child process, with the same interface.
+
+    Slot configuration and cooldowns live in a small shared memory block: the
+    UI writes the slot table, the child writes the cooldowns, and
+    ``cooldown_end`` here is a view of that block for the UI to read. The
+    deadlines ``set_table`` writes there also go with the "sync" command, so
+    the child can re-apply them over a press that raced the change. Commands go
+    over a pipe and presses come back over another one to drive ``on_press``,
+    along with the child's metrics when ``metrics_snapshot`` asks for them.
+    Nothing the UI does can hold the GIL the key-pressing thread needs.
+    """
+
+    def __init__(self, table, key_gap=DEFAULT_KEY_GAP):
+        self.table = table
+        self.on_press = None
+        self._shm = shared_memory.SharedMemory(create=True, size=BLOCK_SIZE)
+        self._block = _SlotBlock(self._shm)
+        self._block.write_config(table)
+        self.cooldown_end = self._block.cooldown_end
+        for i in range(SLOT_COUNT):
+            self.cooldown_end[i] = 0.0
+        child_commands, self._commands = multiprocessing.Pipe(duplex=False)
+        self._events, child_events = multiprocessing.Pipe(duplex=False)
+        self._lock = threading.Lock()
+        self._metrics = None
+        self._metrics_ready = threading.Event()
+        self._process = multiprocessing.Process(
+            target=_child_main, name="MacroFox-engine",
+            args=(self._shm.name, child_commands, child_events, dict(table.timers), key_gap), daemon=True)
+        self._process.start()
+        child_commands.close()
+        child_events.close()
+        threading.Thread(target=self._read_events, name="MacroFox-engine-events", daemon=True).start()
+        atexit.register(self.close)
+
+    def _send(self, cmd, arg=None):
+        with self._lock:
+            try:
+                self._commands.send((cmd, arg))
+            except (OSError, ValueError):
+                pass
+
+    def _read_events(self):
+        while True:
+            try:
+                idx = self._events.recv()
+            except (EOFError, OSError):
+                return
+            if isinstance(idx, tuple):
+                self._metrics = idx[1]
+                self._metrics_ready.set()
+                continue
+            if self.on_press is not None:
+                self.on_press(idx)
+
+    def set_table(self, table, cooldowns=None):
+        if cooldowns:
+            for idx, deadline in cooldowns.items():
+                self.cooldown_end[idx] = deadline
+        self.table = table
+        self._block.write_config(table)
+        self._send("sync", cooldowns)
+
+    def set_timers(self, timers):
+        self.table = self.table.with_timers(timers)
+        self._send("timers", dict(timers))
+
+    def set_key_gap(self, gap):
+        self._send("gap", gap)
+
+    def pause(self):
+        self._send("pause")
+
+    def resume(self):
+        self._send("resume")
+
+    def start(self, delay=0.0):
+        self._send("start", delay)
+
+    def stop(self, timeout=1.0):
+        """Ask the child to stop; it joins its own worker, so this never blocks."""
+        self._send("stop")
+        return True
+
+    def start_recording(self, path):
+        self._send("record", str(path))
+
+    def metrics_snapshot(self, timeout=1.0):
+        """The child engine's metrics, or None if it doesn't answer in time."""
+        self._metrics_ready.clear()
+        self._send("metrics")
+        if not self._metrics_ready.wait(timeout):
+            return None
+        return self._metrics
+
+    def close(self):
+        if self._shm is None:
+            return
+        self._send("exit")
+        self._process.join(1.0)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._block.release()
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
@@ -0,0 +1,133 @@
+import threading
+import time
+from pathlib import Path
+
+from persist import atomic_write, writer
+
+JOURNAL_PATH = Path.home() / "Documents" / "MacroFox" / "Cache" / "cooldowns.journal"
+
+# Rewrite the journal down to the live cooldowns after this many appends
+COMPACT_LINES = 256
+
+
+class CooldownJournal:
+    """Append-only record of when each material's cooldown ends.
+
+    One line per press, ``<material> <deadline>``, with the deadline in
+    time.time() seconds so it still means something after a restart (the
+    monotonic clock doesn't survive a reboot). ``record`` is the only thing
+    the press path calls: one short write and a flush, no fsync. A torn last
+    line from a crash is skipped on replay.
+
+    ``replay`` reads the journal at launch, keeps the newest deadline per
+    material that is still in the future and returns them on the monotonic
+    clock; it also compacts the file to just those lines. After
+    COMPACT_LINES appends ``record`` hands the same compaction to the save
+    thread (persist.writer), which does the fsync; presses recorded while it
+    runs are kept in memory and appended once the new file is in place.
+    """
+
+    def __init__(self, path=JOURNAL_PATH):
+        self.path = path
+        self.deadlines = {}
+        self._file = None
+        self._lines = 0
+        self._compacting = False
+        self._closed = False
+        self._held = []
+        self._lock = threading.Lock()
+
+    def replay(self):
+        self.deadlines = {}
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except OSError:
+            data = b""
+        for line in data.split(b"\n")[:-1]:
+            try:
+                mat, wall = line.decode("utf-8").rsplit(" ", 1)
+                self.deadlines[mat] = float(wall)
+            except ValueError:
+                continue
+        with self._lock:
+            self._closed = False
+            self._compact()
+        wall_now, mono_now = time.time(), time.monotonic()
+        return {mat: mono_now + wall - wall_now for mat, wall in self.deadlines.items()}
+
+    def record(self, mat, deadline):
+        """Log that ``mat`` is on cooldown until ``deadline`` (monotonic)."""
+        wall = time.time() + deadline - time.monotonic()
+        line = f"{mat} {wall:.3f}\n".encode("utf-8")
+        with self._lock:
+            if self._compacting:
+                self.deadlines[mat] = wall
+                self._held.append(line)
+                return
+            if self._file is None:
+                return
+            self.deadlines[mat] = wall
+            try:
+                self._file.write(line)
+                self._file.flush()
+            except OSError:
+                return
+            self._lines += 1
+            if self._lines >= COMPACT_LINES:
+                self._compacting = True
+                writer.put_job(self.path, self._compact_behind)
+
+    def _compact_behind(self):
+        # On the save thread; the press path only appends to _held meanwhile
+        with self._lock:
+            if not self._compacting:
+                return
+            self._close_file()
+            deadlines = self._live()
+        try:
+            self._rewrite(deadlines)
+        except OSError:
+            pass
+        with self._lock:
+            self._compacting = False
+            held, self._held = self._held, []
+            try:
+                self._file = open(self.path, "ab")
+                self._file.write(b"".join(held))
+                self._file.flush()
+            except OSError:
+                self._close_file()
+                return
+            self._lines = len(deadlines) + len(held)
+            if self._closed:
+                self._close_file()
+
+    def _live(self):
+        now = time.time()
+        self.deadlines = {mat: wall for mat, wall in self.deadlines.items() if wall > now}
+        return dict(self.deadlines)
+
+    def _rewrite(self, deadlines):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(self.path, "".join(f"{mat} {wall:.3f}\n" for mat, wall in deadlines.items()).encode("utf-8"))
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _compact(self):
+        self._close_file()
+        deadlines = self._live()
+        try:
+            self._rewrite(deadlines)
+            self._file = open(self.path, "ab")
+        except OSError:
+            return
+        self._lines = len(deadlines)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._close_file()
@@ -1,64 +1,31 @@
-import keyboard
+# Imported first so startup profiling also covers the imports below
+from profiling import startup, runtime as runtime_profiler
+
 import time
 import threading
+import multiprocessing
 import flet as ft
-from flet_timer import Timer
 import json
+from datetime import datetime
 from pathlib import Path
+startup.mark("import flet")
+
+from engine import MacroEngine, SlotTable
+from engine_process import EngineProcess
+startup.mark("import engine")
 
 # --- EMBEDDED ASSETS ---
-from assets_b64 import MATERIAL_IMAGES, APP_ICON_B64
+from assets import get_image_src, app_icon_src, bundled_fonts, prepare_assets_dir
+startup.mark("import assets")
 
 # --- Constants ---
-MATERIALS = ["Sprinkler_Builder", "Gumdrops", "Coconut", "Stinger", "Snowflake", "Jelly_Beans", "Red_Extract", "Blue_Extract", "Glitter", "Glue", "Oil", "Enzymes", "Tropical_Drink", "Purple_Potion", "Super_Smoothie", "Marshmallow_Bee", "Magic_Bean"]
-
-MATERIAL_INFO = {
-    "Blue_Extract": "Grants x1.25 Blue Pollen for 10 minutes.",
-    "Cloud_Vial": "Summons a Cloud in the field you're standing in. Lasts for 3 minutes.",
-    "Coconut": "Drops a huge Coconut into the field. Catch it to convert pollen to Honey Tokens.",
-    "Enzymes": "Grants +10% Instant Conversion and x1.25 Conversion Rate for 10 minutes.",
-    "Glitter": "Boosts the field you're standing in, granting +100% pollen for 15 minutes.",
-    "Glue": "Grants x1.25 Bee Gather Pollen and Tools for 10 minutes.",
-    "Gumdrops": "Use while standing in a field to cover flowers in goo. Goo grants bonus honey.",
-    "Jelly_Beans": "Scatters various buff-granting beans on nearby flowers. Works best when shared.",
-    "Magic_Bean": "Plants a random Sprout in the field you're standing in.",
-    "Marshmallow_Bee": "50% White Pollen, +50% Capacity, and +250% Conversion Rate for 30 minutes.",
-    "Micro-Converter": "Instantly converts all Pollen in your bag to Honey.",
-    "Oil": "Grants x1.2 Bee and Player Movespeed for 10 minutes.",
-    "Purple_Potion": "Grants x1.25 Capacity, x1.25 Convert Rate At Hive, x1.5 Red Pollen, x1.5 Blue Pollen, x1.3 Bee Gather Pollen, and x1.3 Pollen From Tools for 15 minutes.",
-    "Red_Extract": "Grants x1.25 Red Pollen for 10 minutes.",
-    "Snowflake": "Sends a cool, soothing breeze to all the players on the server (Melts after Beesmas!)",
-    "Sprinkler_Builder": "Use while standing in flowers to place a Sprinkler.",
-    "Stinger": "Grants your bees x1.5 attack for 30 seconds.",
-    "Super_Smoothie": "Grants x1.5 Capacity, x1.6 Red Pollen, x1.6 Blue Pollen, x1.6 White Pollen, x1.4 Bee Gather Pollen, x1.4 Pollen From Tools, x2 Convert Rate, x1.5 Convert Rate At Hive, +12% Instant Conversion, +7% Critical Chance, x1.25 Bee Movespeed, and x1.25 Player Movespeed for 20 minutes.",
-    "Tropical_Drink": "Grants x1.25 White Pollen and +5% Critical Chance for 10 minutes.",
-}
-
-MATERIAL_TIMER = {
-    "Blue_Extract": 600,
-    "Cloud_Vial": 180,
-    "Coconut": 1,
-    "Enzymes": 600,
-    "Glitter": 910,
-    "Glue": 600,
-    "Gumdrops": 1,
-    "Jelly_Beans": 45,
-    "Magic_Bean": 1,
-    "Marshmallow_Bee": 1800,
-    "Micro-Converter": 15,
-    "Oil": 600,
-    "Purple_Potion": 900,
-    "Red_Extract": 600,
-    "Snowflake": 1,
-    "Sprinkler_Builder": 5,
-    "Stinger": 10,
-    "Super_Smoothie": 1200,
-    "Tropical_Drink": 600,
-}
-
-PRESETS = {
-    "Boost": ["Sprinkler_Builder", "Stinger", "Coconut", "Jelly_Beans", "Gumdrops", "Super_Smoothie", "Glitter"],
-}
+from catalog import MATERIALS, MATERIAL_INFO, MATERIAL_TIMER, PRESETS
+from presets import PresetIndex, PresetStore
+from persist import writer
+from journal import CooldownJournal
+from metrics import export as export_metrics
+from recorder import SESSIONS_DIR
+from widgets import MaterialPalette, RenderTicker, SlotWidget
 
 # --- Theme Palettes ---
 THEMES = {
@@ -112,65 +79,69 @@ THEMES = {
     },
 }
 
-BORDER_RADIUS = 6
+# Styles derived from each palette, built once so a theme switch or slot
+# redraw only assigns them
+for _name, _colors in THEMES.items():
+    _colors["SLOT_DISABLED_BG"] = ft.Colors.with_opacity(0.2, _colors["DANGER"])
+    _colors["SLOT_DISABLED_BORDER"] = ft.Border.all(2, _colors["DANGER"])
+    _colors["SLOT_COOLDOWN_BG"] = ft.Colors.with_opacity(0.2, _colors["PRIMARY"])
+    _colors["SETTINGS_BTN"] = ft.Colors.GREY_900 if _name == "nothing" else ft.Colors.GREY_700
+
+# Seconds between pressing Start and the first key press, to switch back to the game
+START_DELAY = 1.0
+
+# Presets listed in the picker at once; typing narrows the library down
+PRESET_MATCHES = 8
+
+# Countdown ticks aim this far past a whole-second boundary, so a wait that
+# returns a little early (Windows rounds timeouts to whole milliseconds)
+# still lands after the change instead of right before it
+TICK_MARGIN = 0.005
+
+# --- Fonts ---
+# "bundled": Roboto from the asset pack, "system": the OS default font,
+# "web": Roboto from Google Fonts (needs network before text renders right).
+FONT_STRATEGIES = ["bundled", "system", "web"]
+ROBOTO_WEB_URL = "https://fonts.googleapis.com/css2?family=Roboto:wght@400;500;700&display=swap"
+# Family to use for bold and w500 text; only the bundled faces fill this in
+WEIGHT_FAMILIES = {}
+
+def apply_font(page, strategy):
+    WEIGHT_FAMILIES.clear()
+    if strategy == "web":
+        fonts = {"Roboto": ROBOTO_WEB_URL}
+    elif strategy == "bundled":
+        fonts = bundled_fonts()
+    else:
+        fonts = None
+    if fonts:
+        page.fonts = fonts
+        page.theme = ft.Theme(font_family="Roboto")
+        for weight, family in (("w500", "Roboto Medium"), ("bold", "Roboto Bold")):
+            if family in fonts:
+                WEIGHT_FAMILIES[weight] = family
+    else:
+        # No bundled font (or "system"): stay offline and deterministic
+        page.theme = ft.Theme()
+
+def weight_family(weight):
+    """Font family for text of ``weight``, None for the theme's own."""
+    return WEIGHT_FAMILIES.get(weight)
 
 def format_time(seconds):
     m = int(seconds) // 60
     s = int(seconds) % 60
     return f"{m:02d}:{s:02d}"
 
-def get_image_src(mat):
-    """Return base64 image URI for Flet"""
-    if mat in MATERIAL_IMAGES:
-        return f"data:image/webp;base64,{MATERIAL_IMAGES[mat]}"
-    return None
-
-def create_slot_content(mat, idx, disabled=False, on_cooldown=False, colors=None):
-    if colors is None:
-        colors = THEMES["light"]
-    if mat:
-        src = get_image_src(mat)
-        if src:
-            img = ft.Image(src=src, width=46, height=46)
-            content = img
-        else:
-            content = ft.Text("?", size=16, color=colors["HINT"])
-    else:
-        content = ft.Text(str(idx + 1), size=12, color=colors["HINT"])
-
-    bgcolor = colors["SLOT_BG"]
-    border = None
-    if disabled:
-        bgcolor = ft.Colors.with_opacity(0.2, colors["DANGER"])
-        border = ft.Border.all(2, colors["DANGER"])
-    elif on_cooldown:
-        bgcolor = ft.Colors.with_opacity(0.2, colors["PRIMARY"])
-
-    tooltip_text = ""
-    if mat:
-        base = MATERIAL_INFO.get(mat, "")
-        if disabled:
-            tooltip_text = base + " (Disabled)"
-        elif on_cooldown:
-            tooltip_text = base + " (On Cooldown)"
-        else:
-            tooltip_text = base
-    else:
-        tooltip_text = f"Slot {idx + 1}"
-
-    return ft.Container(
-        width=60,
-        height=60,
-        border_radius=BORDER_RADIUS,
-        bgcolor=bgcolor,
-        border=border,
-        alignment=ft.alignment.Alignment(0, 0),
-        content=content,
-        tooltip=tooltip_text
-    )
+def next_display_change(remaining):
+    """Seconds until format_time(remaining) shows a different value, plus TICK_MARGIN."""
+    return remaining - int(remaining) + TICK_MARGIN
 
 SETTINGS_PATH = Path.home() / "Documents" / "MacroFox" / "Settings" / "settings.json"
 
+# Global hotkeys, in keyboard.add_hotkey syntax; an empty string disables one
+DEFAULT_HOTKEYS = {"start_pause": "f6", "stop": "f7", "export_metrics": "f8", "profile": "f9"}
+
 def load_settings():
     SETTINGS_PATH.parent.mkdir(parents=True, exist_ok=True)
     if SETTINGS_PATH.exists():
@@ -182,11 +153,31 @@ def load_settings():
                 return data
         except:
             pass
-    return {"theme": "light", "always_on_top": False}
+    return {"theme": "light", "always_on_top": False, "key_gap_ms": 30, "font": "bundled", "engine_process": False,
+            "record_sessions": False, "hotkeys": dict(DEFAULT_HOTKEYS)}
 
 def save_settings(data):
-    with open(SETTINGS_PATH, "w") as f:
-        json.dump(data, f, indent=2)
+    writer.put(SETTINGS_PATH, data)
+
+def register_hotkeys(hotkeys, actions):
+    """Hook each configured combo to its action; returns the names that failed.
+
+    Actions run on the keyboard hook thread, so they must not touch controls.
+    """
+    try:
+        import keyboard
+    except ImportError:
+        return list(actions)
+    failed = []
+    for name, action in actions.items():
+        combo = hotkeys.get(name, DEFAULT_HOTKEYS.get(name))
+        if not combo:
+            continue
+        try:
+            keyboard.add_hotkey(combo, action)
+        except (ValueError, OSError):
+            failed.append(name)
+    return failed
 
 # --- Custom Timer Handling ---
 CUSTOM_TIMER_PATH = Path.home() / "Documents" / "MacroFox" / "Settings" / "custom_timers.json"
@@ -206,41 +197,58 @@ def load_custom_timers():
     return {}
 
 def save_custom_timers(data):
-    with open(CUSTOM_TIMER_PATH, "w") as f:
-        json.dump(data, f, indent=2)
+    writer.put(CUSTOM_TIMER_PATH, data)
 
 custom_timers = load_custom_timers()
 EFFECTIVE_MATERIAL_TIMER = {k: custom_timers.get(k, v) for k, v in MATERIAL_TIMER.items()}
+startup.mark("load custom timers")
 
 # --- Main App ---
 def main(page: ft.Page):
+    startup.mark("flet session ready")
     settings = load_settings()
+    startup.mark("load settings")
     current_theme = settings.get("theme", "light")
     always_on_top = settings.get("always_on_top", False)
-
-    if APP_ICON_B64:
-        page.window.icon = f"data:image/png;base64,{APP_ICON_B64}"
+    key_gap_ms = settings.get("key_gap_ms", 30)
+    font_strategy = settings.get("font", "bundled")
+    if font_strategy not in FONT_STRATEGIES:
+        font_strategy = "bundled"
+
+    icon_src = app_icon_src()
+    if icon_src:
+        page.window.icon = icon_src
     page.title = "MacroFox"
     page.window.width = 820
     page.window.height = 480
     page.window.resizable = False
     page.padding = 14
-    page.fonts = {"Roboto": "https://fonts.googleapis.com/css2?family=Roboto:wght@400;500;700&display=swap"}
-    page.theme = ft.Theme(font_family="Roboto")
+    apply_font(page, font_strategy)
     page.window.always_on_top = always_on_top
     page.window.maximizable = False
 
     # State
-    slots = [None] * 7
-    slot_disabled = [False] * 7
-    slot_cooldown_end = [0] * 7
-    material_to_slot = {}
     running = False
     pause_flag = False
+    # "engine_process": run the scheduler in a child process so UI work can
+    # never delay a press; cooldowns are then read from shared memory.
+    engine_class = EngineProcess if settings.get("engine_process", False) else MacroEngine
+    # Slots live in engine.table; every change publishes a new SlotTable
+    engine = engine_class(SlotTable.empty(EFFECTIVE_MATERIAL_TIMER), key_gap_ms / 1000)
+    # Cooldown deadlines are owned by the engine and measured on time.monotonic()
+    slot_cooldown_end = engine.cooldown_end
+    if settings.get("record_sessions"):
+        engine.start_recording(SESSIONS_DIR / f"{datetime.now():%Y-%m-%d_%H-%M-%S}.mfxrec")
+    # Cooldowns still running from the last session, by material; each is
+    # handed back the first time its material is put on the hotbar again
+    journal = CooldownJournal()
+    restored_cooldowns = journal.replay()
 
     # UI refs
     timer_texts = []
-    slot_containers = []
+    # Last (value, color) pushed to each timer text, so ticks only send what changed
+    rendered_timers = [None] * 7
+    slot_widgets = []
     left_panel_ref = ft.Ref[ft.Container]()
     hotbar_container_ref = ft.Ref[ft.Container]()
     info_container_ref = ft.Ref[ft.Container]()
@@ -254,13 +262,13 @@ def main(page: ft.Page):
     stop_btn_ref = ft.Ref[ft.Button]()
     settings_btn_ref = ft.Ref[ft.Button]()
 
-    preset_dir = Path.home() / "Documents" / "MacroFox" / "Preset"
-    preset_dir.mkdir(parents=True, exist_ok=True)
+    preset_store = PresetStore()
 
     def get_colors():
         return THEMES[current_theme]
 
     def apply_theme(theme_name):
+        """Switch theme by re-coloring the controls in place, sent as one update."""
         nonlocal current_theme
         current_theme = theme_name
         colors = THEMES[theme_name]
@@ -270,113 +278,71 @@ def main(page: ft.Page):
         for i in range(7):
             update_slot_display(i)
 
-        if left_panel_ref.current:
-            left_panel_ref.current.bgcolor = colors["PANEL"]
-        if hotbar_container_ref.current:
-            hotbar_container_ref.current.bgcolor = colors["PANEL"]
-        if info_container_ref.current:
-            info_container_ref.current.bgcolor = colors["PANEL"]
-        if controls_container_ref.current:
-            controls_container_ref.current.bgcolor = colors["PANEL"]
+        for ref in (left_panel_ref, hotbar_container_ref, info_container_ref, controls_container_ref):
+            if ref.current:
+                ref.current.bgcolor = colors["PANEL"]
 
         if preset_dropdown_ref.current:
             preset_dropdown_ref.current.bgcolor = colors["BG"]
             preset_dropdown_ref.current.color = colors["FONT"]
 
-        material_list.controls.clear()
-        for mat in MATERIALS:
-            src = get_image_src(mat)
-            img_widget = ft.Image(src=src, width=70, height=70) if src else ft.Text("?", size=24)
-            draggable = ft.Draggable(
-                content=ft.Container(
-                    padding=8,
-                    border_radius=BORDER_RADIUS,
-                    bgcolor=colors["BG"],
-                    content=ft.Row([
-                        img_widget,
-                        ft.Column([
-                            ft.Text(mat.replace("_", " "), size=16, weight="bold", color=colors["FONT"]),
-                            ft.Text(MATERIAL_INFO[mat], size=10, color=colors["HINT"], width=160)
-                        ], spacing=2, expand=True)
-                    ], spacing=10, vertical_alignment=ft.CrossAxisAlignment.START),
-                    tooltip=MATERIAL_INFO[mat]
-                ),
-                data=mat
-            )
-            material_list.controls.append(draggable)
-
-        # Update buttons
-        btn_refs_and_icons = [
-            (apply_preset_btn_ref, ft.Icons.ARROW_OUTWARD_ROUNDED, "Apply preset"),
-            (save_preset_btn_ref, ft.Icons.SAVE, "Save Preset"),
-            (run_pause_btn_ref, None, "Start/Pause"),
-            (stop_btn_ref, ft.Icons.STOP, "Stop"),
-            (settings_btn_ref, ft.Icons.SETTINGS, "Settings")
-        ]
-
-        for ref, icon, tooltip in btn_refs_and_icons:
+        palette.apply_colors(colors)
+        for text in hint_texts:
+            text.color = colors["HINT"]
+
+        for ref in (apply_preset_btn_ref, save_preset_btn_ref):
             if ref.current:
-                if ref == run_pause_btn_ref:
-                    if not running:
-                        ref.current.style.bgcolor = colors["SUCCESS"]
-                        ref.current.content = ft.Icon(ft.Icons.PLAY_ARROW, size=20, color="#FFFFFF")
-                    elif pause_flag:
-                        ref.current.style.bgcolor = colors["SLOT_BG"]
-                        ref.current.content = ft.Icon(ft.Icons.PLAY_ARROW, size=20, color=colors["FONT"])
-                    else:
-                        ref.current.style.bgcolor = colors["WARNING"]
-                        ref.current.content = ft.Icon(ft.Icons.PAUSE, size=20, color="#FFFFFF")
-                elif ref == settings_btn_ref:
-                    grey = ft.Colors.GREY_700 if theme_name != "nothing" else ft.Colors.GREY_900
-                    ref.current.style.bgcolor = grey
-                else:
-                    ref.current.style.bgcolor = colors["PRIMARY"]
-                ref.current.update()
+                ref.current.style.bgcolor = colors["PRIMARY"]
+        if stop_btn_ref.current:
+            stop_btn_ref.current.style.bgcolor = colors["DANGER"]
+        if settings_btn_ref.current:
+            settings_btn_ref.current.style.bgcolor = colors["SETTINGS_BTN"]
+        if run_pause_btn_ref.current:
+            style_run_pause_button(colors)
 
         page.update()
 
+    def style_run_pause_button(colors):
+        btn = run_pause_btn_ref.current
+        if not running:
+            btn.style.bgcolor = colors["SUCCESS"]
+            btn.content = ft.Icon(ft.Icons.PLAY_ARROW, size=20, color="#FFFFFF")
+        elif pause_flag:
+            btn.style.bgcolor = colors["SLOT_BG"]
+            btn.content = ft.Icon(ft.Icons.PLAY_ARROW, size=20, color=colors["FONT"])
+        else:
+            btn.style.bgcolor = colors["WARNING"]
+            btn.content = ft.Icon(ft.Icons.PAUSE, size=20, color="#FFFFFF")
+
     def update_slot_display(idx):
         colors = get_colors()
-        mat = slots[idx]
-        disabled = slot_disabled[idx]
-        on_cooldown = slot_cooldown_end[idx] > time.time()
-
-        if mat is None:
-            new_control = ft.DragTarget(
-                content=create_slot_content(None, idx, disabled, on_cooldown, colors),
-                data=str(idx),
-                on_accept=lambda e, i=idx: on_slot_drop(e, i)
-            )
+        table = engine.table
+        on_cooldown = slot_cooldown_end[idx] > time.monotonic()
+        slot_widgets[idx].set_state(table.materials[idx], table.disabled[idx], on_cooldown, colors)
+        render_timer(idx, time.monotonic(), colors)
+
+    def render_timer(idx, now, colors):
+        """Refresh timer_texts[idx]; returns True if its value or color changed."""
+        remaining = slot_cooldown_end[idx] - now
+        if remaining > 0:
+            state = (format_time(remaining), colors["DANGER"])
         else:
-            inner = ft.Container(
-                content=create_slot_content(mat, idx, disabled, on_cooldown, colors),
-                on_click=lambda e, i=idx: toggle_slot_disabled(i),
-                on_long_press=lambda e, i=idx: clear_slot(i)
-            )
-            new_control = ft.Draggable(
-                content=inner,
-                data=mat,
-                on_drag_complete=lambda e, i=idx: on_item_dragged_out(i)
-            )
-        slot_containers[idx].content = new_control
-
-        remaining = max(0, slot_cooldown_end[idx] - time.time())
-        timer_texts[idx].value = format_time(remaining) if remaining > 0 else "–:–"
-        timer_texts[idx].color = colors["DANGER"] if remaining > 0 else colors["HINT"]
+            state = ("–:–", colors["HINT"])
+        if rendered_timers[idx] == state:
+            return False
+        rendered_timers[idx] = state
+        timer_texts[idx].value, timer_texts[idx].color = state
+        return True
 
     def clear_slot(idx):
-        if slots[idx] is not None:
-            mat = slots[idx]
-            if mat in material_to_slot:
-                del material_to_slot[mat]
-            slots[idx] = None
-            slot_disabled[idx] = False
-            slot_cooldown_end[idx] = 0
+        if engine.table.materials[idx] is not None:
+            engine.set_table(engine.table.with_cleared(idx), {idx: 0})
             update_slot_display(idx)
 
     def toggle_slot_disabled(idx):
-        if not running or slot_cooldown_end[idx] <= time.time():
-            slot_disabled[idx] = not slot_disabled[idx]
+        if not running or slot_cooldown_end[idx] <= time.monotonic():
+            table = engine.table
+            engine.set_table(table.with_disabled(idx, not table.disabled[idx]))
             update_slot_display(idx)
 
     def on_slot_drop(e, target_idx):
@@ -387,70 +353,54 @@ def main(page: ft.Page):
 
         if dragged_data in MATERIALS:
             mat = dragged_data
-            if mat in material_to_slot:
-                old_idx = material_to_slot[mat]
-                if old_idx == target_idx:
-                    return
-                slots[old_idx] = None
-                slot_disabled[old_idx] = False
-                slot_cooldown_end[old_idx] = 0
-                del material_to_slot[mat]
+            table = engine.table
+            old_idx = table.material_to_slot.get(mat)
+            if old_idx == target_idx:
+                return
+            cooldowns = {target_idx: 0}
+            if old_idx is not None:
+                cooldowns[old_idx] = 0
+            else:
+                cooldowns[target_idx] = restored_cooldowns.pop(mat, 0)
+            engine.set_table(table.with_material(target_idx, mat), cooldowns)
+            if old_idx is not None:
                 update_slot_display(old_idx)
-
-            if slots[target_idx] is not None:
-                old_mat = slots[target_idx]
-                if old_mat in material_to_slot:
-                    del material_to_slot[old_mat]
-
-            slots[target_idx] = mat
-            slot_disabled[target_idx] = False
-            slot_cooldown_end[target_idx] = 0
-            material_to_slot[mat] = target_idx
             update_slot_display(target_idx)
 
         elif dragged_data.isdigit():
             source_idx = int(dragged_data)
             if source_idx == target_idx:
                 return
-            slots[source_idx], slots[target_idx] = slots[target_idx], slots[source_idx]
-            slot_disabled[source_idx], slot_disabled[target_idx] = slot_disabled[target_idx], slot_disabled[source_idx]
-            slot_cooldown_end[source_idx], slot_cooldown_end[target_idx] = slot_cooldown_end[target_idx], slot_cooldown_end[source_idx]
-
-            material_to_slot.clear()
-            for i, m in enumerate(slots):
-                if m is not None:
-                    material_to_slot[m] = i
-
+            engine.set_table(engine.table.with_swapped(source_idx, target_idx), {
+                source_idx: slot_cooldown_end[target_idx],
+                target_idx: slot_cooldown_end[source_idx],
+            })
             update_slot_display(source_idx)
             update_slot_display(target_idx)
 
     def on_item_dragged_out(idx):
-        if slots[idx] is not None:
-            mat = slots[idx]
-            if mat in material_to_slot:
-                del material_to_slot[mat]
-            slots[idx] = None
-            slot_disabled[idx] = False
-            slot_cooldown_end[idx] = 0
-            update_slot_display(idx)
+        clear_slot(idx)
 
     # Build initial UI
     for i in range(7):
         timer_texts.append(ft.Text("–:–", size=12))
-        drag_target = ft.DragTarget(
-            content=create_slot_content(None, i, False, False, THEMES[current_theme]),
-            data=str(i),
-            on_accept=lambda e, idx=i: on_slot_drop(e, idx)
-        )
-        container = ft.Container(content=drag_target)
-        slot_containers.append(container)
+        slot = SlotWidget(i, on_slot_drop, toggle_slot_disabled, clear_slot, on_item_dragged_out)
+        slot.set_state(None, False, False, get_colors())
+        slot_widgets.append(slot)
 
     hotbar = ft.Row([
-        ft.Column([slot_containers[i], timer_texts[i]], spacing=4, alignment=ft.MainAxisAlignment.CENTER)
+        ft.Column([slot_widgets[i].container, timer_texts[i]], spacing=4, alignment=ft.MainAxisAlignment.CENTER)
         for i in range(7)
     ], spacing=8, alignment=ft.MainAxisAlignment.CENTER)
 
-    material_list = ft.Column(spacing=6, scroll=ft.ScrollMode.AUTO, height=440)
+    palette = MaterialPalette(MATERIALS, MATERIAL_INFO, 398, THEMES[current_theme], weight_family("bold"))
+    # Hint-colored texts of the info panel
+    hint_texts = []
+
+    def hint_text(value, **kwargs):
+        text = ft.Text(value, color=get_colors()["HINT"], **kwargs)
+        hint_texts.append(text)
+        return text
 
     BUTTON_HEIGHT = 48
 
@@ -459,13 +409,14 @@ def main(page: ft.Page):
         width=180,
         height=BUTTON_HEIGHT,
         label="Select Preset",
-        hint_text="Choose a preset",
+        hint_text="Type to search",
+        editable=True,
         border=ft.InputBorder.OUTLINE,
         border_radius=8,
         border_width=2,
         menu_height=120,
         content_padding=10,
-        text_style=ft.TextStyle(size=15, weight="w500"),
+        text_style=ft.TextStyle(size=15, weight="w500", font_family=weight_family("w500")),
     )
 
     def make_icon_button(icon, bgcolor, tooltip, on_click, ref):
@@ -479,100 +430,200 @@ def main(page: ft.Page):
             tooltip=tooltip
         )
 
-    def run_macro():
-        nonlocal running, pause_flag
-        running = True
-        pause_flag = False
-        time.sleep(1.0)
-        try:
-            while running:
-                if pause_flag:
-                    time.sleep(0.1)
-                    continue
-                current_time = time.time()
-                pressed_any = False
-                for i in range(7):
-                    if not running:
-                        break
-                    mat = slots[i]
-                    if mat is None or slot_disabled[i]:
-                        continue
-                    if current_time >= slot_cooldown_end[i]:
-                        keyboard.press_and_release(str(i + 1))
-                        duration = EFFECTIVE_MATERIAL_TIMER.get(mat, 1)
-                        slot_cooldown_end[i] = current_time + duration
-                        pressed_any = True
-                time.sleep(0.1 if pressed_any else 0.5)
-        finally:
-            running = False
-            pause_flag = False
-
     def ui_update_callback():
         colors = get_colors()
-        current_time = time.time()
+        current_time = time.monotonic()
+        next_change = None
         for i in range(7):
-            remaining = max(0, slot_cooldown_end[i] - current_time)
-            timer_texts[i].value = format_time(remaining) if remaining > 0 else "–:–"
-            timer_texts[i].color = colors["DANGER"] if remaining > 0 else colors["HINT"]
-        try:
-            page.update()
-        except:
-            pass
+            remaining = slot_cooldown_end[i] - current_time
+            if remaining > 0:
+                at = current_time + next_display_change(remaining)
+                next_change = at if next_change is None else min(next_change, at)
+            if render_timer(i, current_time, colors):
+                try:
+                    timer_texts[i].update()
+                except:
+                    pass
+        return next_change
 
-    ui_timer = Timer(callback=ui_update_callback, interval=0.1)
+    ui_timer = RenderTicker(ui_update_callback)
 
-    def on_toggle_run_pause(e):
+    def on_engine_press(idx):
+        mat = engine.table.materials[idx]
+        if mat is not None:
+            journal.record(mat, slot_cooldown_end[idx])
+        ui_timer.poke()
+
+    engine.on_press = on_engine_press
+
+    # Start/pause/stop can come from the buttons or from the global hotkeys,
+    # which call in from the keyboard hook thread.
+    run_state_lock = threading.Lock()
+
+    def toggle_run_pause(delay=START_DELAY):
         nonlocal running, pause_flag
-        colors = get_colors()
-        if not running:
-            threading.Thread(target=run_macro, daemon=True).start()
-            ui_timer.start()
-            run_pause_btn_ref.current.style.bgcolor = colors["WARNING"]
-            run_pause_btn_ref.current.content = ft.Icon(ft.Icons.PAUSE, size=20, color="#FFFFFF")
-        elif running and not pause_flag:
-            pause_flag = True
-            run_pause_btn_ref.current.style.bgcolor = colors["SLOT_BG"]
-            run_pause_btn_ref.current.content = ft.Icon(ft.Icons.PLAY_ARROW, size=20, color=colors["FONT"])
-        else:
+        with run_state_lock:
+            if not running:
+                running = True
+                pause_flag = False
+                engine.start(delay)
+                ui_timer.start()
+            elif not pause_flag:
+                pause_flag = True
+                engine.pause()
+            else:
+                pause_flag = False
+                engine.resume()
+
+    def stop_macro():
+        nonlocal running, pause_flag
+        with run_state_lock:
+            running = False
             pause_flag = False
-            run_pause_btn_ref.current.style.bgcolor = colors["WARNING"]
-            run_pause_btn_ref.current.content = ft.Icon(ft.Icons.PAUSE, size=20, color="#FFFFFF")
-        run_pause_btn_ref.current.update()
+            engine.stop()
+            ui_timer.stop()
+            engine.set_table(engine.table, {i: 0 for i in range(7)})
+
+    def refresh_run_controls(slots=False):
+        # Hotkeys come in through page.run_thread, where nothing is sent
+        # automatically, so whatever changed is pushed here
+        style_run_pause_button(get_colors())
+        if slots:
+            for i in range(7):
+                update_slot_display(i)
+            page.update()
+        else:
+            run_pause_btn_ref.current.update()
+
+    def on_toggle_run_pause(e):
+        toggle_run_pause()
+        refresh_run_controls()
 
     def on_stop(e):
-        nonlocal running, pause_flag
-        running = False
-        pause_flag = False
-        ui_timer.stop()
-        for i in range(7):
-            slot_cooldown_end[i] = 0
-            update_slot_display(i)
-        colors = get_colors()
-        run_pause_btn_ref.current.style.bgcolor = colors["SUCCESS"]
-        run_pause_btn_ref.current.content = ft.Icon(ft.Icons.PLAY_ARROW, size=20, color="#FFFFFF")
-        run_pause_btn_ref.current.update()
+        stop_macro()
+        refresh_run_controls(slots=True)
+
+    # The engine reacts on the hook thread; the window catches up after
+    def on_hotkey_toggle():
+        toggle_run_pause(0.0)
+        page.run_thread(refresh_run_controls)
+
+    def on_hotkey_stop():
+        stop_macro()
+        page.run_thread(refresh_run_controls, True)
+
+    def save_metrics():
+        snapshot = engine.metrics_snapshot()
+        if snapshot is None:
+            return None
+        snapshot["ui_tick_ms"] = ui_timer.tick_ms.snapshot()
+        try:
+            return export_metrics(snapshot)
+        except OSError:
+            return None
+
+    def on_hotkey_export_metrics():
+        folder = save_metrics()
+
+        def notify():
+            colors = get_colors()
+            if folder is None:
+                page.snack_bar = ft.SnackBar(ft.Text("Could not save metrics"), bgcolor=colors["DANGER"])
+            else:
+                page.snack_bar = ft.SnackBar(ft.Text(f"Metrics saved to {folder}"), bgcolor=colors["SUCCESS"])
+            page.snack_bar.open = True
+            page.update()
 
-    def open_settings(e):
+        page.run_thread(notify)
+
+    def on_hotkey_profile():
+        try:
+            stem = runtime_profiler.toggle()
+        except OSError:
+            stem = None
+        profiling = runtime_profiler.running
+
+        def notify():
+            colors = get_colors()
+            if profiling:
+                message, bgcolor = "Profiling… press again to stop", colors["WARNING"]
+            elif stem is None:
+                message, bgcolor = "Profiler stopped, nothing saved", colors["DANGER"]
+            else:
+                message, bgcolor = f"Profile saved to {stem.parent}", colors["SUCCESS"]
+            page.snack_bar = ft.SnackBar(ft.Text(message), bgcolor=bgcolor)
+            page.snack_bar.open = True
+            page.update()
+
+        page.run_thread(notify)
+
+    hotkeys = settings.get("hotkeys", DEFAULT_HOTKEYS)
+    failed_hotkeys = register_hotkeys(hotkeys, {"start_pause": on_hotkey_toggle, "stop": on_hotkey_stop,
+                                                "export_metrics": on_hotkey_export_metrics, "profile": on_hotkey_profile})
+
+    def hotkey_tooltip(label, name):
+        combo = hotkeys.get(name, DEFAULT_HOTKEYS.get(name))
+        if not combo or name in failed_hotkeys:
+            return label
+        return f"{label} ({combo.upper()})"
+
+    theme_names = ["light", "dark", "nothing", "pinky"]
+    # Built on first open and kept; see build_settings_dialog
+    settings_dialog = None
+
+    def build_settings_dialog():
+        """Create the settings dialog once.
+
+        Theme-dependent properties are listed in ``themed`` as (object,
+        attribute, color key), so reopening after a theme change only
+        reassigns those.
+        """
         colors = get_colors()
+        themed = []
+
+        def themed_color(obj, attr, key):
+            setattr(obj, attr, colors[key])
+            themed.append((obj, attr, key))
+            return obj
+
+        def text_style(size, key="FONT"):
+            return themed_color(ft.TextStyle(size=size), "color", key)
+
+        def number_field(value):
+            field = ft.TextField(
+                value=value,
+                width=70,
+                height=32,
+                text_align=ft.TextAlign.RIGHT,
+                input_filter=ft.NumbersOnlyInputFilter(),
+                border_radius=5,
+                dense=True,
+                content_padding=4,
+                text_style=text_style(11),
+            )
+            themed_color(field, "bgcolor", "BG")
+            return themed_color(field, "border_color", "HINT")
+
+        def label(value, size, **kwargs):
+            return themed_color(ft.Text(value, size=size, **kwargs), "color", "FONT")
 
-        always_on_top_val = page.window.always_on_top
         always_on_top_checkbox = ft.Checkbox(
             label="Always on top",
-            value=always_on_top_val,
+            value=page.window.always_on_top,
             check_color="#FFFFFF",
-            active_color=colors["PRIMARY"],
-            label_style=ft.TextStyle(size=13, color=colors["FONT"])
+            label_style=text_style(13),
         )
+        themed_color(always_on_top_checkbox, "active_color", "PRIMARY")
+
+        key_gap_field = number_field(str(key_gap_ms))
 
-        theme_names = ["light", "dark", "nothing", "pinky"]
-        theme_index = theme_names.index(current_theme)
         theme_selector = ft.CupertinoSlidingSegmentedButton(
-            selected_index=theme_index,
-            thumb_color=colors["PRIMARY"],
+            selected_index=theme_names.index(current_theme),
             on_change=lambda ev: None,
             padding=ft.Padding.symmetric(vertical=4, horizontal=10),
             controls=[ft.Text(t.capitalize()) for t in theme_names],
         )
+        themed_color(theme_selector, "thumb_color", "PRIMARY")
 
         timer_fields = {}
         timer_grid = ft.Column(spacing=6)
@@ -584,22 +635,9 @@ def main(page: ft.Page):
         for row_mats in chunks(MATERIALS, 4):
             row_items = []
             for mat in row_mats:
-                current = EFFECTIVE_MATERIAL_TIMER.get(mat, MATERIAL_TIMER.get(mat, 1))
-                field = ft.TextField(
-                    value=str(current),
-                    width=70,
-                    height=32,
-                    text_align=ft.TextAlign.RIGHT,
-                    input_filter=ft.NumbersOnlyInputFilter(),
-                    border_radius=5,
-                    dense=True,
-                    content_padding=4,
-                    text_style=ft.TextStyle(size=11, color=colors["FONT"]),
-                    bgcolor=colors["BG"],
-                    border_color=colors["HINT"],
-                )
+                field = number_field(str(EFFECTIVE_MATERIAL_TIMER.get(mat, MATERIAL_TIMER.get(mat, 1))))
                 timer_fields[mat] = field
-                src = get_image_src(mat)
+                src = get_image_src(mat, 28)
                 img_widget = ft.Image(src=src, width=28, height=28) if src else ft.Text("?", size=16)
                 row_items.append(
                     ft.Container(
@@ -617,64 +655,84 @@ def main(page: ft.Page):
             timer_grid.controls.append(ft.Row(row_items, spacing=8, alignment=ft.MainAxisAlignment.START))
 
         def save_and_close(_):
+            nonlocal key_gap_ms
+            global custom_timers, EFFECTIVE_MATERIAL_TIMER
             new_always_on_top = always_on_top_checkbox.value
             new_theme = theme_names[theme_selector.selected_index]
-            setattr(page.window, "always_on_top", new_always_on_top)
-            save_settings({"theme": new_theme, "always_on_top": new_always_on_top})
-            if new_theme != current_theme:
-                apply_theme(new_theme)
-
-            new_timer_data = {}
+            try:
+                new_key_gap_ms = int(key_gap_field.value)
+            except ValueError:
+                new_key_gap_ms = key_gap_ms
+            if new_key_gap_ms != key_gap_ms:
+                key_gap_ms = new_key_gap_ms
+                engine.set_key_gap(key_gap_ms / 1000)
+            if new_always_on_top != page.window.always_on_top:
+                setattr(page.window, "always_on_top", new_always_on_top)
+            new_settings = {"theme": new_theme, "always_on_top": new_always_on_top, "key_gap_ms": key_gap_ms}
+            if any(settings.get(k) != v for k, v in new_settings.items()):
+                settings.update(new_settings)
+                save_settings(settings)
+
+            # Only timers that differ reach the engine and the file
+            changed = {}
             for mat, field in timer_fields.items():
                 try:
                     val = int(field.value)
-                    if val > 0:
-                        new_timer_data[mat] = val
                 except ValueError:
-                    pass
-            save_custom_timers(new_timer_data)
-            global custom_timers, EFFECTIVE_MATERIAL_TIMER
-            custom_timers = load_custom_timers()
-            EFFECTIVE_MATERIAL_TIMER = {k: custom_timers.get(k, v) for k, v in MATERIAL_TIMER.items()}
+                    continue
+                if val > 0 and val != EFFECTIVE_MATERIAL_TIMER.get(mat):
+                    changed[mat] = val
+            if changed:
+                EFFECTIVE_MATERIAL_TIMER = {**EFFECTIVE_MATERIAL_TIMER, **changed}
+                custom_timers = {k: v for k, v in EFFECTIVE_MATERIAL_TIMER.items() if v != MATERIAL_TIMER[k]}
+                save_custom_timers(custom_timers)
+                engine.set_timers(EFFECTIVE_MATERIAL_TIMER)
 
             page.pop_dialog()
-            page.snack_bar = ft.SnackBar(ft.Text("Settings saved!"), bgcolor=colors["SUCCESS"])
+            page.snack_bar = ft.SnackBar(ft.Text("Settings saved!"), bgcolor=get_colors()["SUCCESS"])
             page.snack_bar.open = True
-            page.update()
+            if new_theme != current_theme:
+                apply_theme(new_theme)
+            else:
+                page.update()
 
         def reset_timers(_):
             for mat, field in timer_fields.items():
                 field.value = str(MATERIAL_TIMER.get(mat, 1))
-            page.update()
+            timer_grid.update()
 
         reset_btn = ft.Button(
             "Reset Timers", on_click=reset_timers,
-            height=30, style=ft.ButtonStyle(bgcolor=colors["SLOT_BG"], color=colors["FONT"],
-                                            shape=ft.RoundedRectangleBorder(radius=6))
+            height=30, style=ft.ButtonStyle(shape=ft.RoundedRectangleBorder(radius=6))
         )
+        themed_color(reset_btn.style, "bgcolor", "SLOT_BG")
+        themed_color(reset_btn.style, "color", "FONT")
 
         save_close_btn = ft.Button(
             "Save & Close", on_click=save_and_close,
             height=36,
-            style=ft.ButtonStyle(bgcolor=colors["PRIMARY"], color="#FFFFFF", shape=ft.RoundedRectangleBorder(radius=6))
+            style=ft.ButtonStyle(color="#FFFFFF", shape=ft.RoundedRectangleBorder(radius=6))
         )
+        themed_color(save_close_btn.style, "bgcolor", "PRIMARY")
 
         settings_content = ft.Column([
             ft.Row(
                 [
-                    ft.Text("⚙️ Settings", size=18, weight="bold", color=colors["FONT"]),
+                    label("⚙️ Settings", 18, weight="bold", font_family=weight_family("bold")),
                     save_close_btn,
                 ],
                 alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
                 vertical_alignment=ft.CrossAxisAlignment.CENTER,
             ),
-            ft.Divider(height=12, color=colors["SLOT_BG"]),
+            themed_color(ft.Divider(height=12), "color", "SLOT_BG"),
             always_on_top_checkbox,
-            ft.Row([ft.Text("Theme:", size=13, color=colors["FONT"]), theme_selector],
+            ft.Row([label("Theme:", 13), theme_selector],
+                   alignment=ft.MainAxisAlignment.START),
+            ft.Row([label("Gap between key presses (ms):", 13), key_gap_field],
                    alignment=ft.MainAxisAlignment.START),
             ft.Divider(height=16, color=ft.Colors.TRANSPARENT),
             ft.Row([
-                ft.Text("Material Cooldowns (sec)", size=14, weight="bold", color=colors["FONT"]),
+                label("Material Cooldowns (sec)", 14, weight="bold", font_family=weight_family("bold")),
                 reset_btn
             ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
             ft.Container(timer_grid, padding=ft.Padding.only(top=6)),
@@ -685,37 +743,69 @@ def main(page: ft.Page):
             content=settings_content,
             content_padding=12,
             shape=ft.RoundedRectangleBorder(radius=10),
-            bgcolor=colors["PANEL"]
         )
-        page.show_dialog(dialog)
+        themed_color(dialog, "bgcolor", "PANEL")
+        return {
+            "dialog": dialog,
+            "themed": themed,
+            "theme": current_theme,
+            "always_on_top": always_on_top_checkbox,
+            "key_gap": key_gap_field,
+            "theme_selector": theme_selector,
+            "timer_fields": timer_fields,
+        }
+
+    def set_if_changed(control, attr, value):
+        if getattr(control, attr) != value:
+            setattr(control, attr, value)
+
+    def open_settings(e):
+        nonlocal settings_dialog
+        if settings_dialog is None:
+            settings_dialog = build_settings_dialog()
+        else:
+            # Bring the cached dialog in line with the current state; Flet
+            # only sends the properties that were actually reassigned
+            d = settings_dialog
+            if d["theme"] != current_theme:
+                colors = get_colors()
+                for obj, attr, key in d["themed"]:
+                    setattr(obj, attr, colors[key])
+                d["theme"] = current_theme
+            set_if_changed(d["always_on_top"], "value", page.window.always_on_top)
+            set_if_changed(d["key_gap"], "value", str(key_gap_ms))
+            set_if_changed(d["theme_selector"], "selected_index", theme_names.index(current_theme))
+            for mat, field in d["timer_fields"].items():
+                set_if_changed(field, "value", str(EFFECTIVE_MATERIAL_TIMER.get(mat, MATERIAL_TIMER.get(mat, 1))))
+        page.show_dialog(settings_dialog["dialog"])
 
     def apply_preset(e):
-        name = preset_dropdown.value
+        # value only holds a picked option; what was typed is in text
+        typed = (preset_dropdown.text or "").strip()
+        name = typed if typed and typed != preset_dropdown.value else preset_dropdown.value
         if not name:
             return
+        if name not in PRESETS and name not in preset_store:
+            # Typed but not picked: take the best match
+            matches = preset_index.search(name, 1)
+            if not matches:
+                return
+            name = matches[0]
         if name in PRESETS:
             preset = PRESETS[name]
         else:
-            preset_path = preset_dir / f"{name}.json"
-            if not preset_path.exists():
-                return
-            try:
-                with open(preset_path, "r") as f:
-                    data = json.load(f)
-                preset = data.get("slots", [])
-            except:
+            preset = preset_store.get(name)
+            if preset is None and preset_store.refresh():
+                preset = preset_store.get(name)
+            if preset is None:
                 return
 
-        material_to_slot.clear()
-        for i in range(7):
-            slots[i] = None
-            slot_disabled[i] = False
-            slot_cooldown_end[i] = 0
-
+        materials = [None] * 7
         for i, mat in enumerate(preset):
             if i < 7 and mat != "empty" and mat in MATERIALS:
-                slots[i] = mat
-                material_to_slot[mat] = i
+                materials[i] = mat
+        cooldowns = {i: restored_cooldowns.pop(mat, 0) if mat else 0 for i, mat in enumerate(materials)}
+        engine.set_table(SlotTable(materials, [False] * 7, engine.table.timers), cooldowns)
 
         for i in range(7):
             update_slot_display(i)
@@ -732,12 +822,10 @@ def main(page: ft.Page):
             name = preset_name_field.value
             if not name or not name.strip():
                 return
-            full_slots = [slots[i] if slots[i] is not None else "empty" for i in range(7)]
-            data = {"name": name.strip(), "slots": full_slots}
-            filepath = preset_dir / f"{name.strip()}.json"
-            with open(filepath, "w") as f:
-                json.dump(data, f, indent=2)
+            full_slots = [mat if mat is not None else "empty" for mat in engine.table.materials]
+            preset_store.save(name.strip(), full_slots)
             load_presets()
+            show_preset_matches(name.strip())
             preset_dropdown.value = name.strip()
             preset_dropdown.update()
             page.pop_dialog()
@@ -746,7 +834,7 @@ def main(page: ft.Page):
         cancel_btn = ft.Button("Cancel", on_click=close_dlg, height=36, style=ft.ButtonStyle(shape=ft.RoundedRectangleBorder(radius=6), bgcolor=colors["SLOT_BG"], color=colors["FONT"]))
 
         save_content = ft.Column([
-            ft.Row([ft.Text("Save Preset", size=18, weight="bold", color=colors["FONT"])], alignment=ft.MainAxisAlignment.CENTER),
+            ft.Row([ft.Text("Save Preset", size=18, weight="bold", font_family=weight_family("bold"), color=colors["FONT"])], alignment=ft.MainAxisAlignment.CENTER),
             ft.Divider(height=12, color=colors["SLOT_BG"]),
             ft.Row([preset_name_field], alignment=ft.MainAxisAlignment.CENTER),
             ft.Row([cancel_btn, save_btn], alignment=ft.MainAxisAlignment.CENTER)
@@ -755,26 +843,52 @@ def main(page: ft.Page):
         save_dialog = ft.AlertDialog(content=save_content, content_padding=8, scrollable=False, shape=ft.RoundedRectangleBorder(radius=8), bgcolor=colors["BG"])
         page.show_dialog(save_dialog)
 
+    preset_index = PresetIndex(PRESETS)
+
+    def show_preset_matches(query=""):
+        # Only the top matches ever become Option controls
+        preset_dropdown.options = [ft.dropdown.Option(name) for name in preset_index.search(query, PRESET_MATCHES)]
+
     def load_presets():
-        options = [ft.dropdown.Option(name) for name in PRESETS]
-        for file in preset_dir.glob("*.json"):
-            options.append(ft.dropdown.Option(file.stem))
-        preset_dropdown.options = options
+        nonlocal preset_index
+        preset_index = PresetIndex(list(PRESETS) + [name for name in preset_store.names() if name not in PRESETS])
+        show_preset_matches()
+
+    def on_preset_text_change(e):
+        show_preset_matches(e.data or "")
+        preset_dropdown.update()
+
+    def on_preset_focus(e):
+        # A stat and a folder listing; only re-reads what changed on disk
+        if preset_store.refresh():
+            load_presets()
+            preset_dropdown.update()
+
+    preset_dropdown.on_focus = on_preset_focus
+    preset_dropdown.on_text_change = on_preset_text_change
 
     # Create buttons
     apply_preset_btn = make_icon_button(ft.Icons.ARROW_OUTWARD_ROUNDED, THEMES[current_theme]["PRIMARY"], "Apply preset", apply_preset, apply_preset_btn_ref)
     save_preset_btn = make_icon_button(ft.Icons.SAVE, THEMES[current_theme]["PRIMARY"], "Save Preset", save_preset, save_preset_btn_ref)
-    run_pause_btn = make_icon_button(ft.Icons.PLAY_ARROW, THEMES[current_theme]["SUCCESS"], "Start/Pause", on_toggle_run_pause, run_pause_btn_ref)
-    stop_btn = make_icon_button(ft.Icons.STOP, THEMES[current_theme]["DANGER"], "Stop", on_stop, stop_btn_ref)
-    settings_btn = make_icon_button(ft.Icons.SETTINGS, ft.Colors.GREY_700 if current_theme != "nothing" else ft.Colors.GREY_900, "Settings", open_settings, settings_btn_ref)
+    run_pause_btn = make_icon_button(ft.Icons.PLAY_ARROW, THEMES[current_theme]["SUCCESS"], hotkey_tooltip("Start/Pause", "start_pause"), on_toggle_run_pause, run_pause_btn_ref)
+    stop_btn = make_icon_button(ft.Icons.STOP, THEMES[current_theme]["DANGER"], hotkey_tooltip("Stop", "stop"), on_stop, stop_btn_ref)
+    settings_btn = make_icon_button(ft.Icons.SETTINGS, THEMES[current_theme]["SETTINGS_BTN"], "Settings", open_settings, settings_btn_ref)
 
     def on_window_event(e):
-        if e.data == "visible":
+        # Rendering stops while the window is out of sight; the engine keeps
+        # pressing keys. Blur only counts when the window isn't pinned on top,
+        # since then the timers are still visible over the game.
+        hidden = (ft.WindowEventType.MINIMIZE, ft.WindowEventType.HIDE)
+        shown = (ft.WindowEventType.RESTORE, ft.WindowEventType.SHOW, ft.WindowEventType.FOCUS)
+        if e.type in hidden or (e.type == ft.WindowEventType.BLUR and not page.window.always_on_top):
+            ui_timer.suspend()
+        elif e.type in shown and ui_timer.suspended:
+            ui_timer.resume()
             for i in range(7):
                 update_slot_display(i)
             page.update()
 
-    page.on_window_event = on_window_event
+    page.window.on_event = on_window_event
 
     hotbar_container = ft.Container(ref=hotbar_container_ref, content=hotbar, padding=10, border_radius=8, margin=ft.margin.Margin(top=0, left=0, right=0, bottom=8))
 
@@ -783,27 +897,26 @@ def main(page: ft.Page):
         content=ft.Column([
             ft.Row([
                 ft.Container(
-                    content=ft.Text(
+                    content=hint_text(
                         "🚫 Long-press slot to clear\n💡 Single-click slot to disable it\n📁 All save files are stored at \nC:\\Documents\\MacroFox",
                         size=11,
-                        color=THEMES[current_theme]["HINT"]
                     ),
                     expand=True
                 ),
                 ft.Container(
                     content=ft.Column([
-                        ft.Text("🦊 MacroFox v1.1", size=11, weight=ft.FontWeight.BOLD, color=THEMES[current_theme]["HINT"]),
-                        ft.Text("This macro is designed specifically for boosting by automating hotbar items usage\n", size=11, color=THEMES[current_theme]["HINT"]),
-                        ft.Text("Update Log:", size=11, weight=ft.FontWeight.BOLD, color=THEMES[current_theme]["HINT"]),
+                        hint_text("🦊 MacroFox v1.1", size=11, weight=ft.FontWeight.BOLD, font_family=weight_family("bold")),
+                        hint_text("This macro is designed specifically for boosting by automating hotbar items usage\n", size=11),
+                        hint_text("Update Log:", size=11, weight=ft.FontWeight.BOLD, font_family=weight_family("bold")),
                         ft.Container(
                             content=ft.ListView(
                                 controls=[
-                                    ft.Text("• Materials now matching in-game inventory sorting", size=11, color=THEMES[current_theme]["HINT"]),
-                                    ft.Text("• Added new items (Snowflake, Red and Blue Extracts, Tropical Drink)", size=11, color=THEMES[current_theme]["HINT"]),
-                                    ft.Text("• Removed Micro-Converter", size=11, color=THEMES[current_theme]["HINT"]),
-                                    ft.Text("• You can customize Materials timer in settings.", size=11, color=THEMES[current_theme]["HINT"]),
-                                    ft.Text("• Now settings will not apply until you press save button", size=11, color=THEMES[current_theme]["HINT"]),
-                                    ft.Text("• Fixed image loading in single-file EXE", size=11, color=THEMES[current_theme]["HINT"]),
+                                    hint_text("• Materials now matching in-game inventory sorting", size=11),
+                                    hint_text("• Added new items (Snowflake, Red and Blue Extracts, Tropical Drink)", size=11),
+                                    hint_text("• Removed Micro-Converter", size=11),
+                                    hint_text("• You can customize Materials timer in settings.", size=11),
+                                    hint_text("• Now settings will not apply until you press save button", size=11),
+                                    hint_text("• Fixed image loading in single-file EXE", size=11),
                                 ],
                                 auto_scroll=False,
                                 padding=0,
@@ -831,7 +944,7 @@ def main(page: ft.Page):
         margin=ft.margin.Margin(top=0, left=0, right=0, bottom=8),
     )
 
-    left_panel = ft.Container(ref=left_panel_ref, content=material_list, padding=6, border_radius=8, expand=False, width=280)
+    left_panel = ft.Container(ref=left_panel_ref, content=palette.control, padding=6, border_radius=8, expand=False, width=280)
 
     page.add(
         ft.Column([
@@ -839,9 +952,19 @@ def main(page: ft.Page):
         ], expand=True, spacing=0)
     )
 
+    startup.mark("build UI tree")
     apply_theme(current_theme)
     load_presets()
     page.update()
-
-# Run without assets_dir since we embed everything
-ft.run(main)
\ No newline at end of file
+    startup.finish("first frame")
+
+if __name__ == "__main__":
+    # Lets the engine child process start from the frozen EXE
+    multiprocessing.freeze_support()
+    # Embedded images are written to a cache folder once and served from there
+    assets_dir = prepare_assets_dir()
+    startup.mark("prepare assets")
+    if assets_dir:
+        ft.run(main, assets_dir=assets_dir)
+    else:
+        ft.run(main)
\ No newline at end of file
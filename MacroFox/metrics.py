@@ -0,0 +1,102 @@
+import json
+import time
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+
+from persist import atomic_write
+
+METRICS_DIR = Path.home() / "Documents" / "MacroFox" / "Metrics"
+
+# Upper bounds in milliseconds; one more bucket catches everything above
+LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; ``observe`` is a bisect and two adds.
+
+    Each histogram has a single writer thread, so nothing is locked; a
+    snapshot taken meanwhile can be one observation behind.
+    """
+
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds=LATENCY_BUCKETS_MS):
+        self.bounds = bounds
+        self.counts = array("Q", [0] * (len(bounds) + 1))
+        self.sum = 0.0
+
+    def observe(self, ms):
+        self.counts[bisect_left(self.bounds, ms)] += 1
+        self.sum += ms
+
+    def snapshot(self):
+        cumulative, total = [], 0
+        for n in self.counts:
+            total += n
+            cumulative.append(total)
+        return {"le": list(self.bounds) + ["+Inf"], "buckets": cumulative, "count": total, "sum": self.sum}
+
+
+class EngineMetrics:
+    """What the engine records about itself, cheap enough to leave on.
+
+    presses_total   key presses sent, per slot
+    press_late_ms   send time minus the cooldown deadline (or the moment the
+                    engine started or resumed, if that was later), per slot
+    key_send_ms     time spent inside the key sink per press
+    loop_pass_ms    one scheduler pass, wakeup to sleep
+    """
+
+    def __init__(self, slots):
+        self.started = time.time()
+        self.presses_total = array("Q", [0] * slots)
+        self.press_late_ms = [Histogram() for _ in range(slots)]
+        self.key_send_ms = Histogram()
+        self.loop_pass_ms = Histogram()
+
+    def snapshot(self):
+        return {
+            "uptime_s": time.time() - self.started,
+            "presses_total": list(self.presses_total),
+            "press_late_ms": [h.snapshot() for h in self.press_late_ms],
+            "key_send_ms": self.key_send_ms.snapshot(),
+            "loop_pass_ms": self.loop_pass_ms.snapshot(),
+        }
+
+
+def _prometheus_histogram(lines, name, snap, labels=""):
+    sep = "," if labels else ""
+    for le, count in zip(snap["le"], snap["buckets"]):
+        lines.append(f'{name}_bucket{{{labels}{sep}le="{le}"}} {count}')
+    suffix = f"{{{labels}}}" if labels else ""
+    lines.append(f"{name}_sum{suffix} {snap['sum']:.3f}")
+    lines.append(f"{name}_count{suffix} {snap['count']}")
+
+
+def prometheus_text(snapshot):
+    """Render a snapshot in the Prometheus text exposition format."""
+    lines = [
+        "# TYPE macrofox_uptime_seconds gauge",
+        f"macrofox_uptime_seconds {snapshot['uptime_s']:.1f}",
+        "# TYPE macrofox_presses_total counter",
+    ]
+    for slot, count in enumerate(snapshot["presses_total"], 1):
+        lines.append(f'macrofox_presses_total{{slot="{slot}"}} {count}')
+    lines.append("# TYPE macrofox_press_late_ms histogram")
+    for slot, snap in enumerate(snapshot["press_late_ms"], 1):
+        _prometheus_histogram(lines, "macrofox_press_late_ms", snap, f'slot="{slot}"')
+    for key in ("key_send_ms", "loop_pass_ms", "ui_tick_ms"):
+        if key in snapshot:
+            lines.append(f"# TYPE macrofox_{key} histogram")
+            _prometheus_histogram(lines, f"macrofox_{key}", snapshot[key])
+    return "\n".join(lines) + "\n"
+
+
+def export(snapshot, folder=METRICS_DIR):
+    """Write metrics.json and metrics.prom into ``folder``; returns the folder."""
+    folder.mkdir(parents=True, exist_ok=True)
+    snapshot = dict(snapshot, exported_at=time.time())
+    atomic_write(folder / "metrics.json", json.dumps(snapshot, indent=2).encode("utf-8"))
+    atomic_write(folder / "metrics.prom", prometheus_text(snapshot).encode("utf-8"))
+    return folder
@@ -0,0 +1,100 @@
+"""Build the binary asset pack loaded by assets.py.
+
+    python pack_assets.py [-o assets.pack] [--thumbs 46,28] materials [more folders...]
+
+Every image or font file below each folder is stored as "<folder>/<relative
+path>". Entries are written in sorted order so the same images always give a
+byte-identical pack.
+
+Each material image also gets a thumbnail per logical size in THUMB_SIZES,
+rendered at THUMB_SCALE times that so it stays sharp on scaled displays and
+stored as "materials/<size>/<name>.webp", so the hotbar and the settings grid
+don't ship and decode the full image. Sizes that would come out within a
+fifth of the source are skipped; the app uses the source for those, as it
+does for everything when Pillow (a build-time dependency only) is missing.
+"""
+import argparse
+import io
+import math
+from pathlib import Path
+
+from assets import PACK_MAGIC, PACK_ENTRY, PACK_HEADER, THUMB_SCALE, THUMB_SIZES
+
+PACK_EXTENSIONS = {".webp", ".png", ".ttf", ".otf"}
+
+
+def collect(folders):
+    files = {}
+    for folder in folders:
+        folder = Path(folder)
+        for path in folder.rglob("*"):
+            if path.is_file() and path.suffix.lower() in PACK_EXTENSIONS:
+                files[f"{folder.name}/{path.relative_to(folder).as_posix()}"] = path.read_bytes()
+    return dict(sorted(files.items()))
+
+
+def _encode_webp(image):
+    """Smallest of lossless and high-quality lossy WebP; fixed settings keep it deterministic."""
+    candidates = []
+    for options in ({"lossless": True, "quality": 100, "method": 6}, {"quality": 85, "alpha_quality": 60, "method": 6}):
+        buf = io.BytesIO()
+        image.save(buf, "WEBP", exact=False, **options)
+        candidates.append(buf.getvalue())
+    return min(candidates, key=len)
+
+
+def make_thumbnails(files, sizes):
+    """Add "materials/<size>/<name>.webp" entries; returns False without Pillow."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return False
+    thumbs = {}
+    for name, data in files.items():
+        folder, _, filename = name.partition("/")
+        if folder != "materials" or "/" in filename or filename == "icon.png":
+            continue
+        with Image.open(io.BytesIO(data)) as source:
+            source = source.convert("RGBA")
+            for size in sizes:
+                pixels = math.ceil(size * THUMB_SCALE)
+                if pixels * 5 > max(source.size) * 4:
+                    continue
+                thumb = source.resize((pixels, pixels), Image.LANCZOS)
+                thumbs[f"materials/{size}/{Path(filename).stem}.webp"] = _encode_webp(thumb)
+    files.update(thumbs)
+    return True
+
+
+def write_pack(files, out):
+    names = [name.encode("utf-8") for name in files]
+    index_size = PACK_HEADER.size + sum(PACK_ENTRY.size + len(n) for n in names)
+    index = [PACK_HEADER.pack(PACK_MAGIC, len(files))]
+    offset = index_size
+    for name, data in zip(names, files.values()):
+        index.append(PACK_ENTRY.pack(len(name), offset, len(data)) + name)
+        offset += len(data)
+    with open(out, "wb") as f:
+        f.write(b"".join(index))
+        for data in files.values():
+            f.write(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack image folders into a MacroFox asset pack")
+    parser.add_argument("folders", nargs="+")
+    parser.add_argument("-o", "--out", default=str(Path(__file__).parent / "assets.pack"))
+    parser.add_argument("--thumbs", default=",".join(map(str, THUMB_SIZES)),
+                        help="comma separated thumbnail sizes in px, empty for none")
+    args = parser.parse_args()
+    files = collect(args.folders)
+    sizes = [int(size) for size in args.thumbs.split(",") if size.strip()]
+    if sizes and not make_thumbnails(files, sizes):
+        print("Pillow is not installed: thumbnails skipped, full-size images only")
+    files = dict(sorted(files.items()))
+    write_pack(files, args.out)
+    print(f"{args.out}: {len(files)} entries, {Path(args.out).stat().st_size} bytes")
+
+
+if __name__ == "__main__":
+    main()
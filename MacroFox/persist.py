@@ -0,0 +1,94 @@
+import atexit
+import json
+import os
+import threading
+import time
+
+# Seconds a write waits for more changes to the same file before it goes out
+WRITE_DELAY = 0.5
+
+
+def atomic_write(path, data):
+    """Replace ``path`` with ``data`` (bytes) so readers see old or new, never half.
+
+    The bytes go to a temp file next to it, are fsynced, then renamed over it.
+    """
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class WriteBehind:
+    """Debounced JSON saves on a background thread.
+
+    ``put`` serialises the data right away, so the caller can keep changing
+    its copy, which stays the authoritative one, and returns without touching
+    the disk. The worker waits ``delay`` seconds, keeps only the newest data
+    per path and writes each file with atomic_write. ``put_job`` queues a
+    callable that writes its file itself, for owners that have to coordinate
+    the rewrite with their own handles. ``flush`` writes whatever is pending
+    and waits for it; it also runs at exit.
+    """
+
+    def __init__(self, delay=WRITE_DELAY):
+        self.delay = delay
+        self.errors = []
+        self._pending = {}
+        self._lock = threading.Lock()
+        # Held for a whole round of writes so an older copy of a file can
+        # never land after a newer one
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._thread = threading.Thread(target=self._run, name="MacroFox-save", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def put(self, path, data):
+        text = json.dumps(data, indent=2).encode("utf-8")
+        with self._lock:
+            self._pending[path] = text
+            self._idle.clear()
+        self._wake.set()
+
+    def put_job(self, path, job):
+        with self._lock:
+            self._pending[path] = job
+            self._idle.clear()
+        self._wake.set()
+
+    def flush(self, timeout=2.0):
+        """Write pending data now; True once everything is on disk."""
+        self._write_pending()
+        return self._idle.wait(timeout)
+
+    def _write_pending(self):
+        with self._write_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            for path, text in pending.items():
+                try:
+                    if callable(text):
+                        text()
+                        continue
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    atomic_write(path, text)
+                except OSError as e:
+                    self.errors.append((path, e))
+            with self._lock:
+                if not self._pending:
+                    self._idle.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            time.sleep(self.delay)
+            self._write_pending()
+
+
+writer = WriteBehind()
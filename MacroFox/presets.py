@@ -0,0 +1,248 @@
+import json
+import os
+import re
+from bisect import bisect_left
+from pathlib import Path
+
+from persist import atomic_write
+
+PRESET_DIR = Path.home() / "Documents" / "MacroFox" / "Preset"
+STORE_NAME = "presets.jsonl"
+
+# Compact the store once it holds this many superseded lines and they
+# outnumber the live presets.
+COMPACT_MIN_STALE = 64
+
+# Most fuzzy candidates looked at per query, so a keystroke costs the same
+# with ten presets or ten thousand
+FUZZY_SCAN = 256
+
+
+def _encode(record):
+    return json.dumps(record, separators=(",", ":")) + "\n"
+
+
+def _new_header():
+    return _encode({"store": 1, "id": os.urandom(8).hex()}).encode("utf-8")
+
+
+def _store_id(header):
+    try:
+        return json.loads(header).get("id")
+    except (ValueError, AttributeError):
+        return None
+
+
+class PresetStore:
+    """All user presets, kept in memory and backed by one append-only file.
+
+    ``presets.jsonl`` in the preset folder starts with a header line holding
+    a random id, new for every rewrite, followed by one compact JSON record per
+    line: ``{"name": ..., "slots": [...]}``, optionally with ``"src"`` =
+    [file name, mtime_ns] for presets imported from the old one-file-per-preset
+    JSON files. A later line for the same name replaces the earlier one, so
+    saving appends a single line and never rewrites the file; the in-memory
+    catalog is the index. ``names`` and ``get`` never touch the disk.
+
+    ``refresh`` picks up outside changes: a store that only grew under the
+    same id is read from where we stopped, anything else is reloaded, and
+    ``*.json`` files that are new or whose mtime differs from the one recorded
+    at import are imported. That takes one stat of the store and one
+    directory listing (``os.scandir``, which on Windows brings the mtimes
+    along), so it is cheap enough for every dropdown open.
+    """
+
+    def __init__(self, folder=PRESET_DIR):
+        self.folder = Path(folder)
+        self.path = self.folder / STORE_NAME
+        self.catalog = {}
+        self._sources = {}
+        self._lines = 0
+        self._offset = 0
+        self._store_mtime = None
+        self._store_id = None
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.refresh()
+
+    def names(self):
+        return list(self.catalog)
+
+    def get(self, name):
+        return self.catalog.get(name)
+
+    def __contains__(self, name):
+        return name in self.catalog
+
+    def __len__(self):
+        return len(self.catalog)
+
+    def save(self, name, slots, src=None):
+        record = {"name": name, "slots": list(slots)}
+        if src is not None:
+            record["src"] = list(src)
+        self.refresh()
+        self._append([record])
+        self._compact_if_needed()
+
+    def refresh(self):
+        """Bring the catalog up to date with the disk; True if it changed."""
+        changed = self._refresh_store()
+        return self._import_json_files() or changed
+
+    def _refresh_store(self):
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            if self._store_mtime is None and not self.catalog:
+                return False
+            self._reset()
+            return True
+        if st.st_mtime_ns == self._store_mtime and st.st_size == self._offset:
+            return False
+        with open(self.path, "rb") as f:
+            header = f.readline()
+            # Rewritten (compacted by another instance) or truncated: start over
+            if _store_id(header) != self._store_id or st.st_size < self._offset:
+                self._reset()
+                self._store_id = _store_id(header)
+                self._offset = len(header)
+            f.seek(self._offset)
+            data = f.read()
+        # Only whole lines; a writer may be halfway through the last one
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            self._load_line(line)
+        self._offset += end
+        self._store_mtime = st.st_mtime_ns
+        return end > 0
+
+    def _reset(self):
+        self.catalog = {}
+        self._sources = {}
+        self._lines = 0
+        self._offset = 0
+        self._store_mtime = None
+        self._store_id = None
+
+    def _load_line(self, line):
+        try:
+            record = json.loads(line)
+            name, slots = record["name"], record["slots"]
+        except (ValueError, KeyError, TypeError):
+            return
+        self._lines += 1
+        # Re-inserting keeps the most recently saved preset last
+        self.catalog.pop(name, None)
+        self.catalog[name] = slots
+        src = record.get("src")
+        if src:
+            self._sources[src[0]] = src[1]
+
+    def _import_json_files(self):
+        records = []
+        try:
+            with os.scandir(self.folder) as it:
+                entries = sorted((e for e in it if e.name.endswith(".json")), key=lambda e: e.name)
+        except OSError:
+            return False
+        for entry in entries:
+            try:
+                mtime = entry.stat().st_mtime_ns
+                if self._sources.get(entry.name) == mtime or not entry.is_file():
+                    continue
+                with open(entry.path, "r") as f:
+                    data = json.load(f)
+                slots = data.get("slots", [])
+            except (OSError, ValueError, AttributeError):
+                continue
+            records.append({"name": Path(entry.name).stem, "slots": slots, "src": [entry.name, mtime]})
+        if records:
+            self._append(records)
+        return bool(records)
+
+    def _append(self, records):
+        lines = "".join(_encode(r) for r in records).encode("utf-8")
+        with open(self.path, "ab") as f:
+            if f.tell() == 0:
+                header = _new_header()
+                f.write(header)
+                self._store_id = _store_id(header)
+                self._offset = len(header)
+            f.write(lines)
+        for line in lines.splitlines():
+            self._load_line(line)
+        self._offset += len(lines)
+        self._store_mtime = self.path.stat().st_mtime_ns
+
+    def _compact_if_needed(self):
+        stale = self._lines - len(self.catalog)
+        if stale < COMPACT_MIN_STALE or stale <= len(self.catalog):
+            return
+        header = _new_header()
+        records = [header.decode("utf-8")]
+        by_name = {Path(file).stem: [file, mtime] for file, mtime in self._sources.items()}
+        for name, slots in self.catalog.items():
+            record = {"name": name, "slots": slots}
+            if name in by_name:
+                record["src"] = by_name[name]
+            records.append(_encode(record))
+        data = "".join(records).encode("utf-8")
+        atomic_write(self.path, data)
+        self._lines = len(self.catalog)
+        self._offset = len(data)
+        self._store_id = _store_id(header)
+        self._store_mtime = self.path.stat().st_mtime_ns
+
+
+def _words(name):
+    return [w for w in re.split(r"[\s_\-]+", name.lower()) if w]
+
+
+class PresetIndex:
+    """Type-ahead lookup over preset names.
+
+    Every word of every name goes into one sorted list, so a query is a
+    bisect plus a walk over at most ``limit`` hits: "smo" finds "Super_Smoothie
+    run". Names are also bucketed by the first letter of each word; when the
+    prefix hits don't fill the list, up to FUZZY_SCAN names from the query's
+    first letter are tried as a subsequence match ("ssr"). ``names`` keeps
+    the order given, which is what an empty query shows.
+    """
+
+    def __init__(self, names):
+        self.names = list(names)
+        self._words = []
+        self._initials = {}
+        for name in self.names:
+            words = _words(name)
+            whole = name.lower()
+            for word in set(words + [whole]):
+                self._words.append((word, name))
+            for initial in {w[0] for w in words}:
+                self._initials.setdefault(initial, []).append(name)
+        self._words.sort()
+        self._keys = [word for word, _ in self._words]
+
+    def search(self, query, limit=8):
+        query = query.strip().lower()
+        if not query:
+            return self.names[:limit]
+        found = []
+        i = bisect_left(self._keys, query)
+        while i < len(self._keys) and len(found) < limit and self._keys[i].startswith(query):
+            name = self._words[i][1]
+            if name not in found:
+                found.append(name)
+            i += 1
+        if len(found) < limit:
+            for name in self._initials.get(query[0], ())[:FUZZY_SCAN]:
+                if name not in found and _is_subsequence(query, name.lower()):
+                    found.append(name)
+                    if len(found) == limit:
+                        break
+        return found
+
+
+def _is_subsequence(query, text):
+    chars = iter(text)
+    return all(c in chars for c in query)
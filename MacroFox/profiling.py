@@ -0,0 +1,228 @@
+import builtins
+import cProfile
+import marshal
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+PROFILE_DIR = Path.home() / "Documents" / "MacroFox" / "Profiles"
+
+
+class StartupProfile:
+    """Timestamped boot phases from the first line of main.py to first frame.
+
+    Turned on with ``--profile-startup`` or MACROFOX_PROFILE_STARTUP=1. Both
+    also take a comma list of extras: ``imports`` times every first-time
+    import, ``cprofile`` runs cProfile over the whole boot, e.g.
+    ``--profile-startup=imports,cprofile``. The report is written to
+    Documents/MacroFox/Profiles when ``finish`` is called; while disabled
+    every method is a no-op.
+    """
+
+    def __init__(self, options):
+        self.enabled = options is not None
+        self.options = set(options or ())
+        self.phases = []
+        self.imports = []
+        self._start = time.perf_counter()
+        # CPU already burnt before main.py ran: interpreter boot and, for the
+        # onefile EXE, the bootloader unpacking the archive.
+        self._cpu_before = time.process_time()
+        self._import_depth = 0
+        self._original_import = None
+        self._profiler = None
+        if not self.enabled:
+            return
+        if "imports" in self.options:
+            self._original_import = builtins.__import__
+            builtins.__import__ = self._timed_import
+        if "cprofile" in self.options:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    @classmethod
+    def from_environment(cls, argv=None, environ=None):
+        argv = sys.argv[1:] if argv is None else argv
+        environ = os.environ if environ is None else environ
+        value = environ.get("MACROFOX_PROFILE_STARTUP")
+        for arg in argv:
+            if arg == "--profile-startup":
+                value = value or "1"
+            elif arg.startswith("--profile-startup="):
+                value = arg.split("=", 1)[1]
+        if not value or value == "0":
+            return cls(None)
+        return cls(opt.strip() for opt in value.split(",") if opt.strip() not in ("", "1"))
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level or name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+        depth = self._import_depth
+        self._import_depth += 1
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            self._import_depth = depth
+            self.imports.append((name, depth, time.perf_counter() - start))
+
+    def mark(self, phase):
+        if self.enabled:
+            self.phases.append((phase, time.perf_counter()))
+
+    def finish(self, phase="first frame"):
+        """Record the last phase and write the report; only the first call counts."""
+        if not self.enabled:
+            return None
+        self.mark(phase)
+        self.enabled = False
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+        if self._profiler is not None:
+            self._profiler.disable()
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        stem = PROFILE_DIR / f"startup-{datetime.now():%Y%m%d-%H%M%S}"
+        report = stem.with_suffix(".txt")
+        with open(report, "w") as f:
+            f.write(self.format_report())
+        if self._profiler is not None:
+            self._profiler.dump_stats(stem.with_suffix(".prof"))
+        return report
+
+    def format_report(self):
+        lines = [f"CPU time before main.py: {self._cpu_before * 1000:.1f} ms", "",
+                 f"{'phase':<32}{'at ms':>10}{'took ms':>10}"]
+        last = self._start
+        for phase, at in self.phases:
+            lines.append(f"{phase:<32}{(at - self._start) * 1000:>10.1f}{(at - last) * 1000:>10.1f}")
+            last = at
+        if self.imports:
+            lines += ["", "Slowest imports (cumulative, nested imports indented):",
+                      f"{'module':<48}{'ms':>10}"]
+            top = sorted(self.imports, key=lambda item: item[2], reverse=True)[:40]
+            for name, depth, took in top:
+                lines.append(f"{'  ' * depth + name:<48}{took * 1000:>10.1f}")
+        return "\n".join(lines) + "\n"
+
+
+class RuntimeProfiler:
+    """Sampling profiler for the live app, switched on and off on demand.
+
+    While on, a background thread grabs the stack of every other thread
+    (engine worker, key dispatcher, UI ticker, Flet handler threads) every
+    ``interval`` seconds with sys._current_frames(), so nothing in those
+    threads is slowed down or needs instrumenting, and it works the same in
+    the frozen EXE. Samples are wall clock: a thread blocked in a wait shows
+    up as time spent there.
+
+    ``stop`` writes two files to Documents/MacroFox/Profiles for the captured
+    window: ``.collapsed`` (one "thread;outer;...;inner count" line per stack,
+    for flamegraph.pl or speedscope) and ``.prof``, the same samples in the
+    pstats format, where self and cumulative time are sample counts times
+    the measured time between samples.
+    """
+
+    def __init__(self, interval=0.005, folder=PROFILE_DIR):
+        self.interval = interval
+        self.folder = folder
+        self.samples = Counter()
+        self.rounds = 0
+        self.elapsed = 0.0
+        self._stopping = threading.Event()
+        self._thread = None
+        self._started = None
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self.samples = Counter()
+        self.rounds = 0
+        self._stopping.clear()
+        self._started = datetime.now()
+        self._thread = threading.Thread(target=self._run, name="MacroFox-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling and write the profile; returns the path stem or None."""
+        if self._thread is None:
+            return None
+        self._stopping.set()
+        self._thread.join()
+        self._thread = None
+        if not self.samples:
+            return None
+        self.folder.mkdir(parents=True, exist_ok=True)
+        stem = self.folder / f"runtime-{self._started:%Y%m%d-%H%M%S}"
+        with open(stem.with_suffix(".collapsed"), "w") as f:
+            f.write(self.format_collapsed())
+        with open(stem.with_suffix(".prof"), "wb") as f:
+            marshal.dump(self.pstats_dict(), f)
+        return stem
+
+    def toggle(self):
+        """Start if stopped; otherwise stop and return what ``stop`` returns."""
+        if self._thread is None:
+            self.start()
+            return None
+        return self.stop()
+
+    def _run(self):
+        me = threading.get_ident()
+        started = time.perf_counter()
+        while not self._stopping.wait(self.interval):
+            self.rounds += 1
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                    frame = frame.f_back
+                stack.reverse()
+                self.samples[(names.get(ident, str(ident)), tuple(stack))] += 1
+        self.elapsed = time.perf_counter() - started
+
+    def format_collapsed(self):
+        lines = []
+        for (thread, stack), count in self.samples.most_common():
+            frames = ";".join(f"{name} ({os.path.basename(file)}:{line})" for file, line, name in stack)
+            lines.append(f"{thread};{frames} {count}")
+        return "\n".join(lines) + "\n"
+
+    def pstats_dict(self):
+        """Samples as the dict pstats.Stats loads: func -> (cc, nc, tt, ct, callers)."""
+        dt = self.elapsed / self.rounds if self.rounds else self.interval
+        stats = {}
+        for (_, stack), count in self.samples.items():
+            seen = set()
+            for depth, func in enumerate(stack):
+                cc, nc, tt, ct, callers = stats.get(func) or (0, 0, 0.0, 0.0, {})
+                leaf = depth == len(stack) - 1
+                tt += count * dt if leaf else 0.0
+                # Recursive frames count once per sample towards cumulative time
+                if func not in seen:
+                    seen.add(func)
+                    cc += count
+                    nc += count
+                    ct += count * dt
+                if depth:
+                    caller = stack[depth - 1]
+                    c_nc, c_cc, c_tt, c_ct = callers.get(caller, (0, 0, 0.0, 0.0))
+                    callers[caller] = (c_nc + count, c_cc + count, c_tt + (count * dt if leaf else 0.0),
+                                       c_ct + count * dt)
+                stats[func] = (cc, nc, tt, ct, callers)
+        return stats
+
+
+startup = StartupProfile.from_environment()
+runtime = RuntimeProfiler()
@@ -0,0 +1,142 @@
+import atexit
+import struct
+import threading
+from array import array
+from pathlib import Path
+
+SESSIONS_DIR = Path.home() / "Documents" / "MacroFox" / "Sessions"
+
+# Log layout: REC_HEADER (magic, wall clock and engine clock at the start,
+# length of the name table), the material names joined by "\n" (a material's
+# code is its index there), then blocks of BLOCK_HEADER (event count)
+# followed by one column per field: t, kind, slot, code, value.
+REC_MAGIC = b"MFXREC01"
+REC_HEADER = struct.Struct("<8sddI")
+BLOCK_HEADER = struct.Struct("<I")
+COLUMNS = (("t", "d"), ("kind", "B"), ("slot", "b"), ("code", "h"), ("value", "i"))
+
+# Event kinds. slot/code/value are -1/-1/0 where they don't apply.
+START, STOP, PAUSE, RESUME = 1, 2, 3, 4
+PRESS = 5      # slot, code of the material pressed
+SLOT = 6       # slot, code of its new material (-1 = empty)
+DISABLE = 7    # slot, value 1 = disabled
+TIMER = 8      # code, value = cooldown in seconds
+KIND_NAMES = {START: "start", STOP: "stop", PAUSE: "pause", RESUME: "resume",
+              PRESS: "press", SLOT: "slot", DISABLE: "disable", TIMER: "timer"}
+
+# Seconds between flushes when the ring isn't filling up on its own
+FLUSH_INTERVAL = 5.0
+
+
+class SessionRecorder:
+    """Fixed-size ring of engine events, written out to a binary log.
+
+    Events live in preallocated column arrays, so ``record`` only stores five
+    numbers under a lock; no per-event objects. A background thread writes
+    the recorded part of the ring as one block whenever it is half full or
+    FLUSH_INTERVAL has passed. If it ever falls a whole ring behind, the
+    oldest events are overwritten and counted in ``dropped``.
+    """
+
+    def __init__(self, path, materials, start_time, wall_time, capacity=4096):
+        self.path = Path(path)
+        self.codes = {mat: code for code, mat in enumerate(materials)}
+        self.capacity = capacity
+        self.dropped = 0
+        self._columns = [array(typecode, bytes(array(typecode).itemsize * capacity)) for _, typecode in COLUMNS]
+        self._head = 0
+        self._flushed = 0
+        self._lock = threading.Lock()
+        self._file_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        names = "\n".join(materials).encode("utf-8")
+        self._file = open(self.path, "wb")
+        self._file.write(REC_HEADER.pack(REC_MAGIC, wall_time, start_time, len(names)) + names)
+        self._thread = threading.Thread(target=self._run, name="MacroFox-recorder", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def record(self, t, kind, slot=-1, code=-1, value=0):
+        t_col, kind_col, slot_col, code_col, value_col = self._columns
+        with self._lock:
+            i = self._head % self.capacity
+            t_col[i] = t
+            kind_col[i] = kind
+            slot_col[i] = slot
+            code_col[i] = code
+            value_col[i] = value
+            self._head += 1
+            if self._head - self._flushed > self.capacity:
+                self._flushed += 1
+                self.dropped += 1
+            if self._head - self._flushed == self.capacity // 2:
+                self._wake.set()
+
+    def flush(self):
+        with self._file_lock:
+            with self._lock:
+                start, end = self._flushed, self._head
+                self._flushed = end
+                a, b = start % self.capacity, end % self.capacity
+                if start == end:
+                    return
+                if a < b:
+                    parts = [col[a:b] for col in self._columns]
+                else:
+                    parts = [col[a:] + col[:b] for col in self._columns]
+            if self._file is None:
+                return
+            self._file.write(BLOCK_HEADER.pack(end - start))
+            for part in parts:
+                part.tofile(self._file)
+            self._file.flush()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self.flush()
+        with self._file_lock:
+            self._file.close()
+            self._file = None
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(FLUSH_INTERVAL)
+            self._wake.clear()
+            if not self._closed:
+                self.flush()
+
+
+def read_session(path):
+    """Load a log; returns (header dict, list of (t, kind, slot, code, value))."""
+    data = Path(path).read_bytes()
+    magic, wall_time, start_time, names_len = REC_HEADER.unpack_from(data, 0)
+    if magic != REC_MAGIC:
+        raise ValueError(f"{path} is not a MacroFox session log")
+    pos = REC_HEADER.size
+    materials = data[pos:pos + names_len].decode("utf-8").split("\n")
+    pos += names_len
+    events = []
+    while pos + BLOCK_HEADER.size <= len(data):
+        (count,) = BLOCK_HEADER.unpack_from(data, pos)
+        pos += BLOCK_HEADER.size
+        columns = []
+        for _, typecode in COLUMNS:
+            col = array(typecode)
+            size = col.itemsize * count
+            if pos + size > len(data):
+                # Torn last block
+                return _header(materials, wall_time, start_time), events
+            col.frombytes(data[pos:pos + size])
+            columns.append(col)
+            pos += size
+        events.extend(zip(*columns))
+    return _header(materials, wall_time, start_time), events
+
+
+def _header(materials, wall_time, start_time):
+    return {"materials": materials, "wall_time": wall_time, "start_time": start_time}
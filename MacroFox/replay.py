@@ -0,0 +1,92 @@
+"""Replay a recorded session and report buff uptime per material.
+
+    python replay.py SESSION.mfxrec [--timeline]
+
+Sessions are recorded by MacroEngine.start_recording (the "record_sessions"
+setting) into Documents/MacroFox/Sessions. Each press of a material counts as
+that buff being up for its cooldown, using the timers recorded with the
+session, i.e. EFFECTIVE_MATERIAL_TIMER as it was at each press (the cooldown
+column shows the last one). Uptime is the share of the session, from the
+first start to the last event, covered by at least one press; max gap is the
+longest stretch the buff was down in between.
+"""
+import argparse
+from datetime import datetime
+
+import recorder as rec
+
+
+def rebuild(header, events):
+    """Walk the events; returns (timeline, {material: [(press time, cooldown)]}, timers, start, end)."""
+    materials = header["materials"]
+    slots = [None] * 7
+    timers = {}
+    presses = {}
+    timeline = []
+    start = None
+    for t, kind, slot, code, value in events:
+        mat = materials[code] if code >= 0 else None
+        if kind == rec.START and start is None:
+            start = t
+        if kind == rec.PRESS:
+            presses.setdefault(mat, []).append((t, timers.get(mat, 1)))
+            detail = f"slot {slot + 1}  {mat}"
+        elif kind == rec.SLOT:
+            slots[slot] = mat
+            detail = f"slot {slot + 1}  {mat or 'empty'}"
+        elif kind == rec.DISABLE:
+            detail = f"slot {slot + 1}  {'off' if value else 'on'}  ({slots[slot] or 'empty'})"
+        elif kind == rec.TIMER:
+            timers[mat] = value
+            detail = f"{mat} = {value}s"
+        else:
+            detail = ""
+        timeline.append((t, rec.KIND_NAMES.get(kind, str(kind)), detail))
+    if start is None:
+        start = header["start_time"]
+    end = events[-1][0] if events else start
+    return timeline, presses, timers, start, end
+
+
+def uptime(presses, start, end):
+    """(covered seconds, longest gap) for ``presses`` of (time, cooldown)."""
+    covered, gap, up_to = 0.0, 0.0, start
+    for t, duration in sorted(presses):
+        t = max(t, start)
+        if t > up_to:
+            gap = max(gap, t - up_to)
+        until = min(t + duration, end)
+        if until > up_to:
+            covered += until - max(t, up_to)
+            up_to = until
+    if end > up_to:
+        gap = max(gap, end - up_to)
+    return covered, gap
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a MacroFox session log")
+    parser.add_argument("session")
+    parser.add_argument("--timeline", action="store_true", help="print every event")
+    args = parser.parse_args()
+
+    header, events = rec.read_session(args.session)
+    timeline, presses, timers, start, end = rebuild(header, events)
+    started = datetime.fromtimestamp(header["wall_time"] + start - header["start_time"])
+    print(f"{args.session}: {len(events)} events, {end - start:.0f} s from {started:%Y-%m-%d %H:%M:%S}")
+
+    if args.timeline:
+        print()
+        for t, kind, detail in timeline:
+            print(f"{t - start:>10.3f}  {kind:<8}{detail}")
+
+    print(f"\n{'material':<20}{'presses':>9}{'cooldown':>10}{'uptime':>9}{'max gap':>9}")
+    for mat, times in sorted(presses.items()):
+        duration = timers.get(mat, 1)
+        covered, gap = uptime(times, start, end)
+        share = covered / (end - start) * 100 if end > start else 0.0
+        print(f"{mat:<20}{len(times):>9}{duration:>9}s{share:>8.1f}%{gap:>8.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+import threading
+import time
+
+import flet as ft
+
+from assets import get_image_src
+from catalog import MATERIAL_INFO
+from metrics import Histogram
+
+BORDER_RADIUS = 6
+
+
+class RenderTicker:
+    """Calls ``callback`` at the time it returns (None = idle) until stopped; nothing while suspended."""
+
+    def __init__(self, callback):
+        self.callback = callback
+        self.suspended = False
+        self.tick_ms = Histogram()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stopped.clear()
+        if self._thread is not None and self._thread.is_alive():
+            self._wake.set()
+            return
+        self._thread = threading.Thread(target=self._run, name="MacroFox-ui", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+
+    def poke(self):
+        self._wake.set()
+
+    def suspend(self):
+        self.suspended = True
+
+    def resume(self):
+        self.suspended = False
+        self._wake.set()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.clear()
+            if self.suspended:
+                self._wake.wait()
+                continue
+            started = time.perf_counter()
+            next_at = self.callback()
+            self.tick_ms.observe((time.perf_counter() - started) * 1000)
+            timeout = None if next_at is None else max(0.0, next_at - time.monotonic())
+            self._wake.wait(timeout)
+
+
+class SlotWidget:
+    """One hotbar slot; both the empty and filled views are built once and restyled by set_state."""
+
+    def __init__(self, idx, on_drop, on_click, on_long_press, on_drag_out):
+        self.idx = idx
+        self.number = ft.Text(str(idx + 1), size=12)
+        self.empty_box = self._box(self.number)
+        self.empty = ft.DragTarget(content=self.empty_box, data=str(idx), on_accept=lambda e: on_drop(e, idx))
+        self.image = ft.Image(src="", width=46, height=46)
+        self.missing = ft.Text("?", size=16)
+        self.filled_box = self._box(self.image)
+        self.filled = ft.Draggable(
+            content=ft.Container(
+                content=self.filled_box,
+                on_click=lambda e: on_click(idx),
+                on_long_press=lambda e: on_long_press(idx)
+            ),
+            on_drag_complete=lambda e: on_drag_out(idx)
+        )
+        self.container = ft.Container(content=self.empty)
+        self._state = None
+
+    @staticmethod
+    def _box(content):
+        return ft.Container(width=60, height=60, border_radius=BORDER_RADIUS,
+                            alignment=ft.alignment.Alignment(0, 0), content=content)
+
+    def set_state(self, mat, disabled, on_cooldown, colors):
+        """Show the slot as given; returns False if it already looked like that."""
+        # THEMES entries are never replaced, so the dict's id names the theme
+        state = (mat, disabled, on_cooldown, id(colors))
+        if state == self._state:
+            return False
+        self._state = state
+
+        if mat is None:
+            box, view = self.empty_box, self.empty
+            self.number.color = colors["HINT"]
+            tooltip_text = f"Slot {self.idx + 1}"
+        else:
+            box, view = self.filled_box, self.filled
+            src = get_image_src(mat, 46)
+            if src:
+                self.image.src = src
+                box.content = self.image
+            else:
+                self.missing.color = colors["HINT"]
+                box.content = self.missing
+            self.filled.data = mat
+            tooltip_text = MATERIAL_INFO.get(mat, "")
+            if disabled:
+                tooltip_text += " (Disabled)"
+            elif on_cooldown:
+                tooltip_text += " (On Cooldown)"
+
+        if disabled:
+            box.bgcolor, box.border = colors["SLOT_DISABLED_BG"], colors["SLOT_DISABLED_BORDER"]
+        elif on_cooldown:
+            box.bgcolor, box.border = colors["SLOT_COOLDOWN_BG"], None
+        else:
+            box.bgcolor, box.border = colors["SLOT_BG"], None
+        box.tooltip = tooltip_text
+        self.container.content = view
+        return True
+
+
+class MaterialPalette:
+    """Searchable material list: POOL_SIZE fixed-height rows rebound to whatever is scrolled into view."""
+
+    ROW_EXTENT = 92
+    POOL_SIZE = 7
+
+    def __init__(self, materials, info, height, colors, title_font=None):
+        self.materials = list(materials)
+        self.info = info
+        self.items = self.materials
+        self.first = 0
+        self._pixels = 0.0
+        self._bound = [None] * self.POOL_SIZE
+        self._top = ft.Container(height=0)
+        self._bottom = ft.Container(height=0)
+        self.rows = []
+        # (card, name text, info text) per pool row, for recoloring
+        self.cards = []
+        for _ in range(self.POOL_SIZE):
+            image = ft.Image(src="", width=70, height=70)
+            missing = ft.Text("?", size=24, visible=False)
+            title = ft.Text(size=16, weight="bold", font_family=title_font, max_lines=1, overflow=ft.TextOverflow.ELLIPSIS)
+            desc = ft.Text(size=10, width=160, max_lines=3, overflow=ft.TextOverflow.ELLIPSIS)
+            card = ft.Container(
+                height=self.ROW_EXTENT - 6,
+                margin=ft.margin.Margin(top=0, left=0, right=0, bottom=6),
+                padding=8,
+                border_radius=BORDER_RADIUS,
+                content=ft.Row([
+                    ft.Stack([image, missing], width=70, height=70),
+                    ft.Column([title, desc], spacing=2, expand=True)
+                ], spacing=10, vertical_alignment=ft.CrossAxisAlignment.START),
+            )
+            self.rows.append((ft.Draggable(content=card), image, missing, title, desc))
+            self.cards.append((card, title, desc))
+        self.search = ft.TextField(
+            hint_text="Search materials",
+            dense=True,
+            height=36,
+            content_padding=8,
+            border_radius=BORDER_RADIUS,
+            prefix_icon=ft.Icons.SEARCH,
+            text_style=ft.TextStyle(size=13),
+            on_change=self._on_search,
+        )
+        self.list = ft.Column(
+            [self._top] + [row[0] for row in self.rows] + [self._bottom],
+            spacing=0,
+            scroll=ft.ScrollMode.AUTO,
+            height=height,
+            scroll_interval=30,
+            on_scroll=self._on_scroll,
+        )
+        self.control = ft.Column([self.search, self.list], spacing=6)
+        self.apply_colors(colors)
+        self._bind(0)
+
+    def apply_colors(self, colors):
+        for card, title, desc in self.cards:
+            card.bgcolor = colors["BG"]
+            title.color = colors["FONT"]
+            desc.color = colors["HINT"]
+        self.search.bgcolor = colors["BG"]
+        self.search.border_color = colors["HINT"]
+        self.search.text_style.color = colors["FONT"]
+
+    def _bind(self, first):
+        self.first = first
+        for k, (draggable, image, missing, title, desc) in enumerate(self.rows):
+            idx = first + k
+            mat = self.items[idx] if idx < len(self.items) else None
+            draggable.visible = mat is not None
+            if mat is None or self._bound[k] == mat:
+                continue
+            self._bound[k] = mat
+            src = get_image_src(mat, 70)
+            image.src = src or ""
+            image.visible, missing.visible = bool(src), not src
+            title.value = mat.replace("_", " ")
+            desc.value = self.info.get(mat, "")
+            draggable.content.tooltip = desc.value
+            draggable.data = mat
+        self._top.height = first * self.ROW_EXTENT
+        self._bottom.height = max(0, len(self.items) - first - self.POOL_SIZE) * self.ROW_EXTENT
+
+    def _first_row(self):
+        # One row of slack above the viewport so a partly scrolled row stays
+        first = int(self._pixels // self.ROW_EXTENT) - 1
+        return max(0, min(first, len(self.items) - self.POOL_SIZE))
+
+    def _on_scroll(self, e):
+        self._pixels = e.pixels
+        first = self._first_row()
+        if first != self.first:
+            self._bind(first)
+            self.list.update()
+
+    def _on_search(self, e):
+        query = (self.search.value or "").strip().lower()
+        if query:
+            self.items = [mat for mat in self.materials
+                          if query in mat.replace("_", " ").lower() or query in self.info.get(mat, "").lower()]
+        else:
+            self.items = self.materials
+        # The client clamps its offset to the new height and reports it back
+        self._bind(self._first_row())
+        self.list.update()